@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark do parser de __NEXT_DATA__ do Spotify.
+
+Compara `spotify._parse_next_data` (passada única, pilha explícita) com
+a versão recursiva anterior (duas passadas, profundidade máxima 10),
+sobre payloads sintéticos no formato das páginas do Spotify (ou sobre
+payloads gravados, passados como arquivos JSON), e confere que as duas
+encontram as mesmas músicas.
+
+    python benchmarks/bench_parser.py --sizes 100 1000 10000
+    python benchmarks/bench_parser.py --payload pagina1.json pagina2.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import spotify  # noqa: E402
+from models import Track  # noqa: E402
+
+
+def legacy_parse_next_data(data):
+    """Versão recursiva anterior (duas passadas, profundidade máxima 10)."""
+    playlist_name = "Spotify Playlist"
+
+    def find_tracks(obj, depth=0):
+        if depth > 10:
+            return []
+        found = []
+        if isinstance(obj, dict):
+            if 'name' in obj and 'artists' in obj and isinstance(obj.get('artists'), list):
+                artists = ", ".join([a.get('name', '') for a in obj['artists'] if isinstance(a, dict)])
+                if obj['name'] and artists:
+                    found.append(Track(obj['name'], artists))
+            for key, value in obj.items():
+                found.extend(find_tracks(value, depth + 1))
+        elif isinstance(obj, list):
+            for item in obj:
+                found.extend(find_tracks(item, depth + 1))
+        return found
+
+    def find_playlist_name(obj, depth=0):
+        if depth > 10:
+            return None
+        if isinstance(obj, dict):
+            if obj.get('__typename') == 'Playlist' and 'name' in obj:
+                return obj['name']
+            if 'playlist' in obj and isinstance(obj['playlist'], dict) and 'name' in obj['playlist']:
+                return obj['playlist']['name']
+            for value in obj.values():
+                result = find_playlist_name(value, depth + 1)
+                if result:
+                    return result
+        elif isinstance(obj, list):
+            for item in obj:
+                result = find_playlist_name(item, depth + 1)
+                if result:
+                    return result
+        return None
+
+    name = find_playlist_name(data)
+    if name:
+        playlist_name = name
+
+    seen = set()
+    unique_tracks = []
+    for t in find_tracks(data):
+        key = (t.name, t.artists)
+        if key not in seen:
+            seen.add(key)
+            unique_tracks.append(t)
+    return playlist_name, unique_tracks
+
+
+def synthetic_payload(size, nesting=0):
+    """Payload parecido com o da página de playlist (metadados, imagens, álbuns).
+
+    `nesting` acrescenta níveis de embrulho em cada item, como nas respostas
+    GraphQL ('itemV2' -> 'data' -> ...).
+    """
+    items = []
+    for i in range(size):
+        item = {
+            'uid': f"uid{i:08x}",
+            'addedAt': {'isoString': "2024-01-01T00:00:00Z"},
+            'track': {
+                '__typename': 'Track',
+                'uri': f"spotify:track:{i:022d}",
+                'name': f"Song {i}",
+                'duration': {'totalMilliseconds': 180000 + i},
+                'artists': [{'name': f"Artist {i % 997}", 'uri': f"spotify:artist:{i % 997}"},
+                            {'name': f"Feat {i % 31}", 'uri': f"spotify:artist:f{i % 31}"}],
+                'album': {
+                    'name': f"Album {i % 211}",
+                    'images': [{'url': f"https://i.scdn.co/image/{i}-{w}", 'width': w} for w in (64, 300, 640)],
+                },
+            },
+        }
+        for _ in range(nesting):
+            item = {'itemV2': {'data': item}}
+        items.append(item)
+    return {
+        'props': {
+            'pageProps': {
+                'state': {
+                    'data': {
+                        'playlist': {
+                            '__typename': 'Playlist',
+                            'name': "Playlist Sintetica",
+                            'owner': {'name': "Alguem"},
+                            'content': {'totalCount': size, 'items': items},
+                        },
+                    },
+                    'settings': {'locale': 'pt-BR', 'flags': {f"flag{i}": bool(i % 2) for i in range(200)}},
+                },
+            },
+        },
+    }
+
+
+def bench(fn, data, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(data)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--nesting', type=int, default=3,
+                        help="Niveis extras do payload 'profundo' (alem do limite da versao antiga)")
+    parser.add_argument('--payload', nargs='+', default=[], help="Arquivos JSON de __NEXT_DATA__ gravados")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = [(f"sintetico {size}", synthetic_payload(size)) for size in args.sizes]
+    payloads.append((f"profundo {args.sizes[-1]}", synthetic_payload(args.sizes[-1], args.nesting)))
+    for path in args.payload:
+        payloads.append((Path(path).name, json.loads(Path(path).read_text(encoding='utf-8'))))
+
+    print(f"{'payload':<24}{'musicas':>9}{'antes ms':>11}{'agora ms':>11}{'ganho':>8}")
+    for label, data in payloads:
+        old_ms, (old_name, old_tracks) = bench(legacy_parse_next_data, data, args.repeat)
+        new_ms, (new_name, new_tracks) = bench(spotify._parse_next_data, data, args.repeat)
+        same = old_name == new_name and \
+            [(t.name, t.artists) for t in old_tracks] == [(t.name, t.artists) for t in new_tracks]
+        gain = f"{old_ms / new_ms:>7.1f}x" if same else f"{'-':>8}"
+        print(f"{label:<24}{len(new_tracks):>9}{old_ms:>11.2f}{new_ms:>11.2f}{gain}")
+        if not same:
+            # A versão nova não tem limite de profundidade: pode achar mais músicas
+            print(f"  resultados diferentes: {len(old_tracks)} musicas antes, {len(new_tracks)} agora")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
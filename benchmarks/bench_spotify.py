@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark da importação de links do Spotify, offline.
+
+Serve um corpus de páginas (veja spotify_corpus.py) num servidor HTTP local
+e roda `spotify.fetch_playlist` contra ele, passando por cada caminho de
+extração: __NEXT_DATA__ do embed, regex title/subtitle do embed,
+__NEXT_DATA__ da página, ld+json e nome pelo oEmbed. Para cada playlist
+mostra o tempo total (mediana) separado em rede (requisições HTTP ao
+servidor local, com o download das páginas) e extração (o resto: decodificar
+e analisar as páginas), o pico de memória (tracemalloc) e quantas músicas
+foram recuperadas. O servidor roda em outro processo, então a memória
+medida é só a da importação.
+
+    python benchmarks/bench_spotify.py --sizes 100 1000 5000
+    python benchmarks/bench_spotify.py --corpus corpus/ --record 37i9dQZF1DXcBWIGoYBM5M
+    python benchmarks/bench_spotify.py --corpus corpus/ --no-generate
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+import spotify  # noqa: E402
+import spotify_corpus  # noqa: E402
+
+
+class FetchTimer:
+    """Soma o tempo gasto nas requisições HTTP da sessão do spotify.py."""
+
+    def __init__(self, session):
+        self.seconds = 0.0
+        self._get = session.get
+        session.get = self.get
+
+    def get(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._get(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def fetch(playlist_id):
+    return spotify.fetch_playlist(playlist_id)
+
+
+def bench(playlist_id, repeat, timer):
+    """(medianas em ms de total/rede/extração, pico de memória em KB, nome, músicas, erro)."""
+    totals, fetches, parses = [], [], []
+    try:
+        for _ in range(repeat):
+            timer.seconds = 0.0
+            start = time.perf_counter()
+            name, tracks = fetch(playlist_id)
+            total = time.perf_counter() - start
+            totals.append(total * 1000)
+            fetches.append(timer.seconds * 1000)
+            parses.append((total - timer.seconds) * 1000)
+        tracemalloc.start()
+        fetch(playlist_id)
+        _, peak = tracemalloc.get_traced_memory()
+    except Exception as e:
+        return None, None, None, [], e
+    finally:
+        tracemalloc.stop()
+    ms = tuple(statistics.median(values) for values in (totals, fetches, parses))
+    return ms, peak / 1024, name, tracks, None
+
+
+def corpus_size_kb(folder):
+    return sum(f.stat().st_size for f in folder.iterdir() if f.is_file()) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000],
+                        help="Musicas das playlists sinteticas")
+    parser.add_argument('--paths', nargs='+', choices=spotify_corpus.PATHS, default=list(spotify_corpus.PATHS),
+                        help="Caminhos de extracao das playlists sinteticas")
+    parser.add_argument('--corpus', help="Pasta do corpus (padrao: pasta temporaria)")
+    parser.add_argument('--no-generate', action='store_true',
+                        help="Nao gerar playlists sinteticas (usar so o que ja esta no corpus)")
+    parser.add_argument('--record', nargs='+', default=[], metavar='ID',
+                        help="Gravar no corpus as paginas reais destas playlists publicas (precisa de rede)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='spotify_corpus_') as tmp:
+        corpus = Path(args.corpus or tmp)
+        corpus.mkdir(parents=True, exist_ok=True)
+        for playlist_id in args.record:
+            print(f"Gravado: {spotify_corpus.record(corpus, playlist_id)}")
+        if not args.no_generate:
+            spotify_corpus.generate(corpus, args.sizes, args.paths)
+
+        process, spotify.BASE_URL = spotify_corpus.start_server(corpus)
+        timer = FetchTimer(spotify.get_session())
+        try:
+            print(f"{'playlist':<16}{'KB':>8}{'musicas':>9}{'ms':>10}{'rede ms':>10}{'parse ms':>10}{'pico KB':>10}  nome")
+            for folder in sorted(p for p in corpus.iterdir() if p.is_dir()):
+                ms, peak, name, tracks, error = bench(folder.name, args.repeat, timer)
+                if error is not None:
+                    print(f"{folder.name:<16}{corpus_size_kb(folder):>8.0f}  falhou: {error}".splitlines()[0])
+                    continue
+                total, fetch_ms, parse_ms = ms
+                print(f"{folder.name:<16}{corpus_size_kb(folder):>8.0f}{len(tracks):>9}"
+                      f"{total:>10.2f}{fetch_ms:>10.2f}{parse_ms:>10.2f}{peak:>10.0f}  {name}")
+        finally:
+            process.terminate()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização da interface gráfica.
+
+Abre `gui.py` várias vezes com STARTUP_BENCHMARK=1 e mede o tempo até a
+primeira pintura da janela (incluindo a inicialização do Python). Precisa
+de um display; em servidores use `xvfb-run python benchmarks/bench_startup.py`.
+
+    python benchmarks/bench_startup.py --runs 10 --max-ms 1500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_once():
+    env = dict(os.environ, STARTUP_BENCHMARK='1')
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, str(ROOT / 'gui.py')],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True
+    )
+    line = proc.stdout.readline()
+    wall_ms = (time.perf_counter() - start) * 1000
+    proc.wait(timeout=30)
+    if not line:
+        raise RuntimeError("gui.py terminou sem reportar a primeira pintura")
+    result = json.loads(line)
+    result['wall_ms'] = wall_ms
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, help="Falha (exit 1) se a mediana passar deste valor")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    report = {}
+    for field in ('imports_ms', 'construct_ms', 'first_paint_ms', 'wall_ms'):
+        values = [r[field] for r in runs]
+        report[field] = {'min': min(values), 'median': statistics.median(values), 'max': max(values)}
+
+    print(f"{'fase':<16}{'min':>10}{'mediana':>10}{'max':>10}")
+    for field, stats in report.items():
+        print(f"{field:<16}{stats['min']:>10.1f}{stats['median']:>10.1f}{stats['max']:>10.1f}")
+
+    if args.max_ms is not None and report['wall_ms']['median'] > args.max_ms:
+        print(f"REGRESSAO: mediana {report['wall_ms']['median']:.1f} ms > {args.max_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark da transferência com um YouTube Music simulado (offline).
+
+Roda o motor de verdade (TransferEngine: buscas concorrentes, limitador,
+gravação em lotes, caches) contra `fake_ytmusic.FakeYTMusic`, para várias
+quantidades de músicas e de buscas simultâneas, e mede músicas por
+segundo e as latências p50/p95/p99 das buscas e dos lotes gravados.
+
+Cada execução usa uma pasta temporária nova (cache/, journals/, reports/),
+então nenhuma busca vem do cache e nada da sua pasta é alterado.
+
+    python benchmarks/bench_transfer.py --sizes 100 1000 --workers 1 4 8
+    python benchmarks/bench_transfer.py --latency lognormal:0.08:0.6 --server-rate 15 --rate 0
+    python benchmarks/bench_transfer.py --target merge --existing 5000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from engine import TransferEngine, make_playlist  # noqa: E402
+from fake_ytmusic import FakeYTMusic, catalog_song  # noqa: E402
+from models import Track  # noqa: E402
+from ratelimit import AdaptiveRateLimiter  # noqa: E402
+from search import SearchEngine  # noqa: E402
+
+
+def build_playlists(count, size, miss_rate, catalog_size, existing=0):
+    """Playlists sintéticas; uma fração `miss_rate` das músicas não está no catálogo."""
+    playlists = []
+    step = max(1, round(1 / miss_rate)) if miss_rate else 0
+    for p in range(count):
+        tracks = []
+        for i in range(size):
+            index = existing + p * size + i
+            if step and i % step == step - 1:
+                index += catalog_size  # fora do catálogo: "não encontrada"
+            tracks.append(Track(*catalog_song(index)))
+        playlists.append(make_playlist(f"Bench {p + 1}", tracks, source='bench'))
+    return playlists
+
+
+def run(args, size, workers, workdir):
+    ytm = FakeYTMusic(catalog_size=args.catalog, latency=args.latency, write_latency=args.write_latency,
+                      error_rate=args.error_rate, server_rate=args.server_rate,
+                      server_burst=args.server_burst, seed=args.seed)
+    # Pasta nova por execução: caches vazios e nada gravado no projeto
+    os.chdir(tempfile.mkdtemp(dir=workdir))
+    engine = TransferEngine(ytm, parallel=args.parallel)
+    # Troca o SearchEngine padrão (encerrando os workers dele) pelo desta quantidade de buscas
+    engine.search_engine.shutdown()
+    engine.search_engine = SearchEngine(engine.search_song, workers=workers)
+    if args.rate:
+        engine.limiter = AdaptiveRateLimiter(rate=args.rate, max_rate=args.rate)
+
+    playlists = build_playlists(args.playlists, size, args.miss_rate, args.catalog, args.existing)
+    if args.target == 'merge':
+        target = ytm.create_playlist("Bench destino", "")
+        ytm.add_playlist_items(target, [f"vid{i:08d}" for i in range(args.existing)])
+        for playlist in playlists:
+            playlist.update(target='merge', target_id=target, target_name="Bench destino")
+
+    start = time.perf_counter()
+    try:
+        engine.transfer(playlists)
+    finally:
+        engine.search_engine.shutdown()
+    elapsed = time.perf_counter() - start
+    report = engine.metrics.report()
+    return elapsed, report, ytm
+
+
+def ms(phase, key):
+    return f"{phase.get(key, 0.0) * 1000:.0f}" if phase else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500],
+                        help="Musicas por playlist")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8],
+                        help="Buscas simultaneas")
+    parser.add_argument('--playlists', type=int, default=1, help="Playlists por execucao")
+    parser.add_argument('--parallel', type=int, default=3, help="Playlists transferidas ao mesmo tempo")
+    parser.add_argument('--target', choices=['new', 'merge'], default='new')
+    parser.add_argument('--existing', type=int, default=0,
+                        help="Musicas ja presentes na playlist de destino (com --target merge)")
+    parser.add_argument('--latency', default='lognormal:0.05:0.5',
+                        help="Latencia das leituras/buscas (ex.: 0.05, uniform:0.02:0.2, lognormal:0.05:0.5)")
+    parser.add_argument('--write-latency', default='lognormal:0.15:0.4',
+                        help="Latencia de create_playlist/add_playlist_items")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fracao de respostas 503")
+    parser.add_argument('--server-rate', type=float, default=0.0,
+                        help="Requisicoes/s aceitas pelo servidor simulado; acima disso responde 429 (0 = sem limite)")
+    parser.add_argument('--server-burst', type=float, default=None,
+                        help="Rajada maxima aceita pelo servidor simulado (padrao: 1 s de --server-rate)")
+    parser.add_argument('--miss-rate', type=float, default=0.05, help="Fracao de musicas fora do catalogo")
+    parser.add_argument('--catalog', type=int, default=100_000, help="Musicas no catalogo simulado")
+    parser.add_argument('--rate', type=float, default=200.0,
+                        help="Limite fixo de requisicoes/s (0 = limitador adaptativo padrao do programa)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    if args.existing + args.playlists * max(args.sizes) > args.catalog:
+        parser.error("--catalog precisa ser maior que --existing + playlists x maior tamanho")
+
+    print(f"{'musicas':>8}{'buscas':>8}{'tempo s':>9}{'musicas/s':>11}"
+          f"{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'lote p50':>10}{'429':>6}{'retries':>9}{'gravadas':>10}")
+    with tempfile.TemporaryDirectory(prefix='bench_transfer_') as workdir:
+        for size in args.sizes:
+            for workers in args.workers:
+                elapsed, report, ytm = run(args, size, workers, workdir)
+                phases = report['phases']
+                search = phases.get('search')
+                add = phases.get('add_items')
+                tracks = report['counters'].get('tracks', 0)
+                print(f"{size * args.playlists:>8}{workers:>8}{elapsed:>9.2f}{tracks / elapsed:>11.1f}"
+                      f"{ms(search, 'p50'):>8}{ms(search, 'p95'):>8}{ms(search, 'p99'):>8}{ms(add, 'p50'):>10}"
+                      f"{ytm.throttled:>6}{report['counters'].get('retries', 0):>9}"
+                      f"{report['counters'].get('tracks_added', 0):>10}", flush=True)
+        os.chdir(ROOT)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
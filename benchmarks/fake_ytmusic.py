@@ -0,0 +1,167 @@
+"""
+Substituto local do YTMusic para benchmarks (sem conta e sem rede).
+
+Implementa só os métodos usados pelo programa (search, create_playlist,
+get_playlist, add_playlist_items, get_library_playlists e
+get_library_songs), com latência, taxa de erros 5xx, limite de
+requisições do servidor e tamanho do catálogo configuráveis. As falhas
+usam a mesma mensagem do ytmusicapi ("Server returned HTTP 429: ..."),
+então passam pelo limitador adaptativo como na vida real.
+
+O 429 vem de um token bucket do lado do servidor (`server_rate`
+requisições por segundo, rajadas de até `server_burst`), compartilhado
+por todos os métodos: quanto mais rápido o cliente, mais 429; ao
+desacelerar, eles param. Assim o limitador adaptativo tem um ponto de
+equilíbrio para encontrar.
+
+O catálogo tem as músicas `catalog_song(i)` para i < catalog_size; buscas
+por qualquer outra coisa voltam vazias ("não encontrada").
+"""
+
+import itertools
+import math
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ratelimit import TokenBucket  # noqa: E402
+
+ARTISTS = 997
+
+
+def catalog_song(i):
+    """(nome, artistas) da i-ésima música do catálogo sintético.
+
+    Nomes com largura fixa: nenhum é trecho de outro, senão o merge (que
+    compara títulos por substring) pularia músicas novas.
+    """
+    return f"Song {i:08d}", f"Artist {i % ARTISTS}"
+
+
+def parse_latency(spec):
+    """Distribuição de latência (segundos) a partir de um texto.
+
+    - "0.05" ou "const:0.05": sempre 50 ms
+    - "uniform:0.02:0.2": uniforme entre 20 e 200 ms
+    - "lognormal:0.08:0.5": lognormal com mediana 80 ms e sigma 0.5
+    - "0" ou "none": sem latência
+    """
+    kind, _, args = str(spec).partition(':')
+    if not args:
+        kind, args = ('none', '') if kind in ('none', '0', '') else ('const', kind)
+    values = [float(v) for v in args.split(':') if v]
+    if kind == 'none':
+        return lambda rng: 0.0
+    if kind == 'const':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Distribuicao de latencia desconhecida: {spec}")
+
+
+class FakeServerError(Exception):
+    """Erro HTTP simulado (mesmo texto das exceções do ytmusicapi)."""
+
+
+class FakeYTMusic:
+    """YTMusic simulado em memória; seguro para várias threads."""
+
+    def __init__(self, catalog_size=100_000, latency='0.05', write_latency=None,
+                 error_rate=0.0, server_rate=None, server_burst=None, seed=None):
+        self.catalog_size = catalog_size
+        self.error_rate = error_rate
+        # Limite do servidor (None = sem limite)
+        self._quota = TokenBucket(server_rate, server_burst or max(1, server_rate)) if server_rate else None
+        self._latency = parse_latency(latency)
+        self._write_latency = parse_latency(write_latency if write_latency is not None else latency)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._catalog = {}
+        for i in range(catalog_size):
+            name, artists = catalog_song(i)
+            self._catalog[f"{name} {artists}"] = (name, artists, f"vid{i:08d}")
+        self.playlists = {}  # id -> {'title', 'tracks': [...]}
+        self.calls = {}
+        self.errors = 0
+        self.throttled = 0
+
+    def _request(self, method, latency):
+        """Simula uma requisição: conta, espera e às vezes falha."""
+        allowed = self._quota is None or self._quota.try_acquire()
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            delay = latency(self._rng)
+            roll = self._rng.random()
+        time.sleep(delay)
+        if not allowed:
+            with self._lock:
+                self.throttled += 1
+            raise FakeServerError("Server returned HTTP 429: Too Many Requests.")
+        if roll < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise FakeServerError("Server returned HTTP 503: Service Unavailable.")
+
+    def search(self, query, filter=None, scope=None, limit=20, ignore_spelling=False):
+        self._request('search', self._latency)
+        song = self._catalog.get(query)
+        if song is None:
+            return []
+        name, artists, video_id = song
+        return [{'resultType': 'song', 'title': name, 'videoId': video_id,
+                 'artists': [{'name': a} for a in artists.split(', ')]}][:limit]
+
+    def create_playlist(self, title, description, privacy_status='PRIVATE', video_ids=None, source_playlist=None):
+        self._request('create_playlist', self._write_latency)
+        with self._lock:
+            playlist_id = f"PLfake{next(self._ids):06d}"
+            self.playlists[playlist_id] = {'title': title, 'tracks': []}
+        if video_ids:
+            self.add_playlist_items(playlist_id, video_ids)
+        return playlist_id
+
+    def add_playlist_items(self, playlistId, videoIds=None, source_playlist=None, duplicates=False):
+        self._request('add_playlist_items', self._write_latency)
+        results = []
+        with self._lock:
+            tracks = self.playlists[playlistId]['tracks']
+            for video_id in videoIds or []:
+                set_video_id = f"set{next(self._ids):08d}"
+                index = int(video_id[3:]) if video_id.startswith('vid') else 0
+                name, artists = catalog_song(index)
+                tracks.append({'title': name, 'artists': [{'name': artists}],
+                               'videoId': video_id, 'setVideoId': set_video_id})
+                results.append({'videoId': video_id, 'setVideoId': set_video_id})
+        return {'status': 'STATUS_SUCCEEDED', 'playlistEditResults': results}
+
+    def get_playlist(self, playlistId, limit=100, related=False, suggestions_limit=0):
+        self._request('get_playlist', self._latency)
+        with self._lock:
+            playlist = self.playlists[playlistId]
+            tracks = list(playlist['tracks'])
+        return {
+            'id': playlistId,
+            'title': playlist['title'],
+            'trackCount': len(tracks),
+            # Como na API: limit=None traz tudo, senão a primeira página (100)
+            'tracks': tracks if limit is None else tracks[:max(100, limit)],
+        }
+
+    def get_library_playlists(self, limit=25):
+        self._request('get_library_playlists', self._latency)
+        with self._lock:
+            items = [{'playlistId': pid, 'title': p['title'], 'count': str(len(p['tracks']))}
+                     for pid, p in reversed(self.playlists.items())]
+        return items if limit is None else items[:limit]
+
+    def get_library_songs(self, limit=25, validate_responses=False, order=None):
+        self._request('get_library_songs', self._latency)
+        return []
@@ -0,0 +1,184 @@
+"""
+Corpus de páginas do Spotify e servidor HTTP local que as serve.
+
+Cada playlist do corpus é uma pasta com as respostas gravadas:
+
+    <corpus>/<id>/embed.html    https://open.spotify.com/embed/playlist/<id>
+    <corpus>/<id>/page.html     https://open.spotify.com/playlist/<id>
+    <corpus>/<id>/oembed.json   https://open.spotify.com/oembed?url=...<id>
+
+Arquivo ausente = HTTP 404, o que força `spotify.iter_playlist` a cair no
+próximo caminho de extração. `generate` cria corpora sintéticos, um por
+caminho (embed __NEXT_DATA__, regex title/subtitle do embed, __NEXT_DATA__
+da página, ld+json e nome pelo oEmbed); `record` grava as respostas reais
+de uma playlist pública para entrar no mesmo corpus.
+"""
+
+import json
+import multiprocessing
+import re
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from bench_parser import synthetic_payload  # noqa: E402
+
+# Caminho de extração -> o que o servidor responde para a playlist
+PATHS = ('embed', 'regex', 'page', 'ldjson', 'oembed')
+CONTENT_TYPES = {'.html': 'text/html; charset=utf-8', '.json': 'application/json; charset=utf-8'}
+
+# Scripts e estilos que acompanham as páginas reais (peso fixo por página)
+_BOILERPLATE = "<style>" + "".join(f".c{i}{{margin:{i}px}}" for i in range(3000)) + "</style>" + \
+    "<script>" + "".join(f"var v{i}=function(a){{return a+{i}}};" for i in range(3000)) + "</script>"
+
+
+def _song(i):
+    return f"Song {i:06d}", [f"Artist {i % 997}", f"Feat {i % 31}"]
+
+
+def _html(body):
+    return f"<!DOCTYPE html><html><head><title>Spotify</title>{_BOILERPLATE}</head><body>{body}</body></html>"
+
+
+def _script_json(data, script_id=None, script_type="application/json"):
+    attrs = f' id="{script_id}"' if script_id else ''
+    return f'<script{attrs} type="{script_type}">{json.dumps(data, ensure_ascii=False)}</script>'
+
+
+def embed_track_list(size):
+    return [{
+        'uri': f"spotify:track:{i:022d}",
+        'uid': f"{i:016x}",
+        'title': _song(i)[0],
+        'subtitle': ", ".join(_song(i)[1]),
+        'duration': 180000 + i,
+        'isPlayable': True,
+        'isExplicit': bool(i % 7 == 0),
+        'audioPreview': {'url': f"https://p.scdn.co/mp3-preview/{i:040x}"},
+    } for i in range(size)]
+
+
+def embed_next_data(size, name="Playlist Sintetica"):
+    """__NEXT_DATA__ do embed player: state.data.entity com trackList."""
+    entity = {'name': name, 'type': 'playlist', 'uri': "spotify:playlist:synthetic",
+              'coverArt': {'sources': [{'url': "https://i.scdn.co/image/cover", 'width': 300}]},
+              'trackList': embed_track_list(size)}
+    return {'props': {'pageProps': {'state': {'data': {'entity': entity},
+                                              'settings': {'locale': 'pt-BR', 'theme': 'dark'}}}},
+            'page': '/embed/playlist/[id]', 'buildId': 'synthetic'}
+
+
+def generate_playlist(path, size):
+    """Respostas {arquivo: texto} que levam `iter_playlist` pelo caminho indicado."""
+    name = f"Playlist {path} {size}"
+    if path == 'embed':
+        return {'embed.html': _html(_script_json(embed_next_data(size, name), "__NEXT_DATA__"))}
+    if path in ('regex', 'oembed'):
+        # Dados do embed fora do __NEXT_DATA__ (só os padrões "title"/"subtitle")
+        entity = embed_next_data(size, name)['props']['pageProps']['state']['data']['entity']
+        if path == 'oembed':
+            del entity['name']  # sem nome no embed: vem do oEmbed
+        files = {'embed.html': _html(f"<script>window.__STATE__ = {json.dumps(entity, ensure_ascii=False)};</script>")}
+        if path == 'oembed':
+            files['oembed.json'] = json.dumps({'title': name, 'type': 'rich', 'provider_name': 'Spotify'})
+        return files
+    if path == 'page':
+        data = synthetic_payload(size)
+        data['props']['pageProps']['state']['data']['playlist']['name'] = name
+        return {'page.html': _html(_script_json(data, "__NEXT_DATA__"))}
+    if path == 'ldjson':
+        ld = {'@context': 'https://schema.org', '@type': 'MusicPlaylist', 'name': name, 'numTracks': size,
+              'track': [{'@type': 'MusicRecording', 'name': _song(i)[0], 'duration': 'PT3M',
+                         'byArtist': [{'@type': 'MusicGroup', 'name': a} for a in _song(i)[1]]}
+                        for i in range(size)]}
+        return {'page.html': _html(_script_json(ld, script_type="application/ld+json"))}
+    raise ValueError(f"Caminho desconhecido: {path}")
+
+
+def generate(corpus, sizes, paths=PATHS):
+    """Grava no corpus uma playlist sintética por caminho e tamanho; retorna os IDs."""
+    ids = []
+    for path in paths:
+        for size in sizes:
+            playlist_id = f"{path}{size}"
+            folder = Path(corpus) / playlist_id
+            folder.mkdir(parents=True, exist_ok=True)
+            for filename, text in generate_playlist(path, size).items():
+                (folder / filename).write_text(text, encoding='utf-8')
+            ids.append(playlist_id)
+    return ids
+
+
+def record(corpus, playlist_id, label=None):
+    """Grava as respostas reais do Spotify para uma playlist pública."""
+    import spotify
+
+    session = spotify.get_session()
+    headers = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0'}
+    folder = Path(corpus) / (label or playlist_id)
+    folder.mkdir(parents=True, exist_ok=True)
+    urls = {
+        'embed.html': f"https://open.spotify.com/embed/playlist/{playlist_id}",
+        'page.html': f"https://open.spotify.com/playlist/{playlist_id}",
+        'oembed.json': f"https://open.spotify.com/oembed?url=https://open.spotify.com/playlist/{playlist_id}",
+    }
+    for filename, url in urls.items():
+        resp = session.get(url, headers=headers, timeout=20)
+        if resp.status_code == 200:
+            (folder / filename).write_bytes(resp.content)
+    return folder.name
+
+
+class CorpusHandler(BaseHTTPRequestHandler):
+    """Responde como open.spotify.com a partir dos arquivos do corpus."""
+
+    corpus = Path('.')
+    _ROUTES = (
+        (re.compile(r'^/embed/playlist/([^/?]+)$'), 'embed.html'),
+        (re.compile(r'^/playlist/([^/?]+)$'), 'page.html'),
+    )
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = None
+        for pattern, filename in self._ROUTES:
+            match = pattern.match(url.path)
+            if match:
+                path = self.corpus / match.group(1) / filename
+        if url.path == '/oembed':
+            link = parse_qs(url.query).get('url', [''])[0]
+            path = self.corpus / link.rstrip('/').rsplit('/', 1)[-1] / 'oembed.json'
+        if path is None or not path.is_file():
+            self.send_error(404)
+            return
+        body = path.read_bytes()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPES[path.suffix])
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(corpus, port_queue):
+    """Serve o corpus em 127.0.0.1 numa porta livre (informada em port_queue)."""
+    handler = type('Handler', (CorpusHandler,), {'corpus': Path(corpus)})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server(corpus):
+    """Servidor num processo separado (não entra na medição de memória); retorna (processo, URL)."""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(str(corpus), port_queue), daemon=True)
+    process.start()
+    return process, f"http://127.0.0.1:{port_queue.get(timeout=10)}"
+
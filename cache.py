@@ -0,0 +1,371 @@
+"""
+Caches locais persistentes (SQLite).
+
+Ficam na pasta `cache/` ao lado dos arquivos de autenticação, e podem ser
+apagados a qualquer momento sem perda de dados.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = Path('cache')
+
+# Sentinela para "chave ausente" (None é um resultado válido: não encontrada)
+MISS = object()
+
+
+def _connect(path):
+    """Abre o banco em modo WAL; se não for possível, usa um banco em memória."""
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    except (OSError, sqlite3.Error):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+    return conn
+
+
+class SearchCache:
+    """Cache de buscas: chave normalizada 'nome|artistas' -> videoId.
+
+    Guarda também resultados negativos ("não encontrada"), com um TTL
+    menor, e remove as entradas menos usadas quando passa de `max_entries`.
+    """
+
+    TTL = 30 * 24 * 3600
+    NEGATIVE_TTL = 24 * 3600
+    MAX_ENTRIES = 100_000
+    EVICT_EVERY = 500  # inserções entre verificações de tamanho
+
+    def __init__(self, path=CACHE_DIR / 'search.sqlite3', ttl=TTL, negative_ttl=NEGATIVE_TTL, max_entries=MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search ("
+                " key TEXT PRIMARY KEY,"
+                " video_id TEXT,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS search_accessed ON search(accessed_at)")
+
+    def get(self, key):
+        """Retorna o videoId, None (não encontrada) ou MISS."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT video_id, created_at FROM search WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                video_id, created_at = row
+                ttl = self.ttl if video_id else self.negative_ttl
+                if now - created_at <= ttl:
+                    with self._conn:
+                        self._conn.execute("UPDATE search SET accessed_at = ? WHERE key = ?", (now, key))
+                    self.hits += 1
+                    return video_id
+            self.misses += 1
+            return MISS
+
+    def put(self, key, video_id):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search (key, video_id, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, video_id, now, now)
+            )
+            self._puts += 1
+            if self._puts % self.EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        """Remove expiradas e, se ainda estiver cheio, as menos acessadas."""
+        now = time.time()
+        self._conn.execute(
+            "DELETE FROM search WHERE (video_id IS NOT NULL AND created_at < ?) OR (video_id IS NULL AND created_at < ?)",
+            (now - self.ttl, now - self.negative_ttl)
+        )
+        count = self._conn.execute("SELECT COUNT(*) FROM search").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            # Libera 10% a mais para não despejar a cada inserção
+            excess += self.max_entries // 10
+            self._conn.execute(
+                "DELETE FROM search WHERE key IN (SELECT key FROM search ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            )
+
+    def stats(self):
+        """Contadores de acertos/falhas desde a abertura do cache."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PlaylistCache:
+    """Playlists do Spotify já importadas, por ID.
+
+    Guarda nome e músicas junto com os validadores HTTP da página do
+    embed (ETag/Last-Modified) e o hash do conteúdo. Dentro do TTL a
+    playlist é reaproveitada sem acessar a rede; depois disso a página é
+    revalidada e, se não mudou, o parse é pulado.
+    """
+
+    TTL = 3600
+
+    def __init__(self, path=CACHE_DIR / 'spotify.sqlite3', ttl=TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS playlists ("
+                " playlist_id TEXT PRIMARY KEY,"
+                " name TEXT NOT NULL,"
+                " tracks TEXT NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " sha1 TEXT,"
+                " fetched_at REAL NOT NULL)"
+            )
+
+    def get(self, playlist_id):
+        """Entrada da playlist (dict, com 'fresh' = dentro do TTL) ou None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, tracks, etag, last_modified, sha1, fetched_at FROM playlists WHERE playlist_id = ?",
+                (playlist_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        name, tracks, etag, last_modified, sha1, fetched_at = row
+        return {
+            'name': name,
+            'tracks': json.loads(tracks),  # [[nome, artistas], ...]
+            'etag': etag,
+            'last_modified': last_modified,
+            'sha1': sha1,
+            'fetched_at': fetched_at,
+            'fresh': time.time() - fetched_at <= self.ttl,
+        }
+
+    def put(self, playlist_id, name, tracks, etag=None, last_modified=None, sha1=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlists"
+                " (playlist_id, name, tracks, etag, last_modified, sha1, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (playlist_id, name, json.dumps([[t.name, t.artists] for t in tracks], ensure_ascii=False),
+                 etag, last_modified, sha1, time.time())
+            )
+
+    def touch(self, playlist_id):
+        """Marca a entrada como revalidada agora (o TTL recomeça)."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE playlists SET fetched_at = ? WHERE playlist_id = ?", (time.time(), playlist_id))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LibraryPlaylistCache:
+    """Lista de playlists da biblioteca do YouTube Music (com as contagens).
+
+    Exibida assim que o programa conecta, enquanto a lista completa é
+    buscada; depois de uma transferência só as playlists alteradas são
+    atualizadas.
+    """
+
+    def __init__(self, path=CACHE_DIR / 'ytmusic.sqlite3'):
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS library_playlists ("
+                " playlist_id TEXT PRIMARY KEY,"
+                " title TEXT NOT NULL,"
+                " count TEXT,"
+                " position INTEGER NOT NULL)"
+            )
+
+    def load(self):
+        """[(playlist_id, title, count), ...] na ordem da biblioteca."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT playlist_id, title, count FROM library_playlists ORDER BY position"
+            ).fetchall()
+
+    def replace(self, rows):
+        """Substitui a lista inteira."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM library_playlists")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO library_playlists (playlist_id, title, count, position) VALUES (?, ?, ?, ?)",
+                [(pid, title, count, i) for i, (pid, title, count) in enumerate(rows)]
+            )
+
+    def update(self, playlist_id, title, count):
+        """Atualiza uma playlist; as novas vão para o topo, como na biblioteca."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE library_playlists SET title = ?, count = ? WHERE playlist_id = ?", (title, count, playlist_id)
+            )
+            if not cur.rowcount:
+                self._conn.execute(
+                    "INSERT INTO library_playlists (playlist_id, title, count, position)"
+                    " SELECT ?, ?, ?, COALESCE(MIN(position), 0) - 1 FROM library_playlists",
+                    (playlist_id, title, count)
+                )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SnapshotCache:
+    """Cópia local das músicas das playlists de destino do modo merge.
+
+    Cada playlist guarda [titulo, artistas, videoId, setVideoId] por música
+    e o total de músicas. A cópia é atualizada com o que a transferência
+    adiciona, e só é descartada quando a playlist muda por fora (o total
+    ou a primeira página não conferem).
+    """
+
+    def __init__(self, path=CACHE_DIR / 'snapshots.sqlite3'):
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " playlist_id TEXT PRIMARY KEY,"
+                " tracks TEXT NOT NULL,"
+                " track_count INTEGER NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def get(self, playlist_id):
+        """Linhas da playlist ou None."""
+        with self._lock:
+            row = self._conn.execute("SELECT tracks FROM snapshots WHERE playlist_id = ?", (playlist_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, playlist_id, rows, track_count=None):
+        """Grava a cópia; `track_count` é o total informado pelo YouTube Music."""
+        with self._lock, self._conn:
+            self._put(playlist_id, rows, len(rows) if track_count is None else track_count)
+
+    def track_count(self, playlist_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT track_count FROM snapshots WHERE playlist_id = ?", (playlist_id,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def append(self, playlist_id, rows):
+        """Acrescenta músicas recém-adicionadas à cópia (se ela existir)."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT tracks, track_count FROM snapshots WHERE playlist_id = ?", (playlist_id,)
+            ).fetchone()
+            if row is not None:
+                self._put(playlist_id, json.loads(row[0]) + rows, row[1] + len(rows))
+
+    def _put(self, playlist_id, rows, track_count):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO snapshots (playlist_id, tracks, track_count, updated_at) VALUES (?, ?, ?, ?)",
+            (playlist_id, json.dumps(rows, ensure_ascii=False), track_count, time.time())
+        )
+
+    def discard(self, playlist_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM snapshots WHERE playlist_id = ?", (playlist_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-1 do conteúdo de um arquivo."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImportManifest:
+    """CSVs já importados: caminho -> tamanho, mtime, hash e as músicas lidas.
+
+    Ao reimportar, um arquivo que não mudou é carregado das músicas
+    guardadas, sem ler o CSV de novo. O hash só é recalculado quando o
+    mtime mudou mas o tamanho não (arquivo copiado ou salvo de novo com o
+    mesmo conteúdo).
+    """
+
+    def __init__(self, path=CACHE_DIR / 'imports.sqlite3'):
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        self.hits = 0
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS csv_files ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime REAL NOT NULL,"
+                " sha1 TEXT NOT NULL,"
+                " tracks TEXT NOT NULL,"
+                " imported_at REAL NOT NULL)"
+            )
+
+    def cached(self, filepath):
+        """Músicas ([[nome, artistas], ...]) da última importação, se o arquivo não mudou; senão None."""
+        path = os.path.abspath(filepath)
+        st = os.stat(path)
+        with self._lock:
+            row = self._conn.execute("SELECT size, mtime, sha1, tracks FROM csv_files WHERE path = ?", (path,)).fetchone()
+        if row is None or row[0] != st.st_size:
+            return None
+        if row[1] != st.st_mtime:
+            if file_digest(path) != row[2]:
+                return None
+            with self._lock, self._conn:
+                self._conn.execute("UPDATE csv_files SET mtime = ? WHERE path = ?", (st.st_mtime, path))
+        with self._lock:
+            self.hits += 1
+        return json.loads(row[3])
+
+    def record(self, filepath, sha1, tracks):
+        """Registra o arquivo como importado (hash do conteúdo lido e as músicas)."""
+        path = os.path.abspath(filepath)
+        st = os.stat(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO csv_files (path, size, mtime, sha1, tracks, imported_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime, sha1,
+                 json.dumps([[t.name, t.artists] for t in tracks], ensure_ascii=False), time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
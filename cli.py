@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Spotify to YouTube Music Transfer - Linha de comando
+
+Transfere playlists sem interface gráfica (servidores, cron). Usa o mesmo
+motor da interface (engine.py) e não importa tkinter/customtkinter.
+
+Exemplos:
+    python cli.py https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M --auth oauth.json
+    python cli.py rock.csv mpb.csv --auth browser_headers.json --target merge --playlist-id PLxxxx
+    python cli.py rock.csv --auth oauth.json --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+
+from engine import PARALLEL_PLAYLISTS, TransferEngine, connect, import_links, import_source
+from logbuffer import log_to_file
+import spotify
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Transfere playlists do Spotify para o YouTube Music.")
+    parser.add_argument('sources', nargs='+', metavar='LINK_OU_CSV',
+                        help="Links de playlists do Spotify ou arquivos CSV do Exportify")
+    parser.add_argument('--auth', required=True,
+                        help="Arquivo de autenticacao (oauth.json ou browser_headers.json)")
+    parser.add_argument('--target', choices=('new', 'merge'), default='new',
+                        help="Criar nova playlist (padrao) ou fazer merge com uma existente")
+    parser.add_argument('--playlist-id', help="ID da playlist do YouTube Music para o merge")
+    parser.add_argument('--resume', action='store_true',
+                        help="Retomar transferencias interrompidas em vez de recomecar")
+    parser.add_argument('--parallel', type=int, default=PARALLEL_PLAYLISTS, metavar='N',
+                        help=f"Playlists transferidas ao mesmo tempo (padrao: {PARALLEL_PLAYLISTS})")
+    parser.add_argument('--library', action='store_true',
+                        help="Procurar primeiro no indice local da biblioteca (criado se nao existir)")
+    parser.add_argument('--rebuild-library', action='store_true',
+                        help="Recriar o indice local da biblioteca antes de transferir")
+    parser.add_argument('--stream', action='store_true',
+                        help="Ler um link do Spotify e transferir direto, sem listar antes (nova playlist)")
+    parser.add_argument('--json', action='store_true',
+                        help="Imprimir eventos como JSON (uma linha por evento)")
+    return parser
+
+
+def print_text(kind, **data):
+    if kind == 'log':
+        log_to_file(data['message'])
+    if kind in ('log', 'status'):
+        print(data['message'], flush=True)
+    elif kind == 'progress' and data['track']:
+        print(f"[{data['playlist_index'] + 1}/{data['playlist_total']}] {data['name']}: "
+              f"{data['done']}/{data['total']} {data['track']}", flush=True)
+
+
+def print_json(kind, **data):
+    if kind == 'log':
+        log_to_file(data['message'])
+    print(json.dumps({'event': kind, **data}, ensure_ascii=False), flush=True)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.target == 'merge' and not args.playlist_id:
+        parser.error("--target merge exige --playlist-id")
+    if args.stream and (len(args.sources) != 1 or args.target != 'new'):
+        parser.error("--stream aceita um unico link e apenas --target new")
+
+    emit = print_json if args.json else print_text
+
+    def log(message):
+        emit('log', message=message)
+
+    if args.stream:
+        spotify_id = spotify.extract_playlist_id(args.sources[0])
+        if not spotify_id:
+            log(f"Link invalido: {args.sources[0]}")
+            return 1
+
+    sources = [] if args.stream else args.sources
+    files = [source for source in sources if os.path.isfile(source)]
+    links = [source for source in sources if not os.path.isfile(source)]
+
+    results = []
+    for source in files:
+        try:
+            results.append((source, import_source(source, log=log), None))
+        except Exception as e:
+            results.append((source, None, e))
+    # Links são buscados em paralelo; a ordem final segue a linha de comando
+    results.extend(import_links(links, log=log))
+    results.sort(key=lambda result: sources.index(result[0]))
+
+    playlists = []
+    for source, playlist, error in results:
+        if error is not None:
+            log(f"Erro ao importar {source}: {error}")
+            continue
+        if not playlist['tracks']:
+            log(f"Aviso: Nenhuma musica encontrada em {source}")
+            continue
+        playlist['target'] = args.target
+        if args.target == 'merge':
+            playlist['target_id'] = args.playlist_id
+            playlist['target_name'] = args.playlist_id
+        playlists.append(playlist)
+        log(f"Importado: {playlist['name']} ({playlist['tracks_total']} musicas)")
+
+    if not playlists and not args.stream:
+        return 1
+
+    try:
+        ytm = connect(args.auth)
+    except Exception as e:
+        log(f"Erro ao conectar ao YouTube Music: {e}")
+        return 1
+
+    engine = TransferEngine(ytm, emit=emit, parallel=args.parallel)
+    if args.library or args.rebuild_library:
+        try:
+            if args.rebuild_library or not engine.open_library():
+                engine.build_library()
+        except Exception as e:
+            log(f"Erro ao indexar biblioteca: {e}")
+    result = {}
+
+    # Transferir numa thread para que Ctrl+C cancele de forma limpa
+    if args.stream:
+        job = lambda: engine.fetch_and_transfer(spotify_id)
+    else:
+        job = lambda: engine.transfer(playlists, args.resume)
+
+    def run():
+        try:
+            result['cancelled'] = job()
+        except Exception as e:
+            result['error'] = e
+            log(f"Erro na transferencia: {e}")
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.5)
+    except KeyboardInterrupt:
+        log("Cancelando transferencia...")
+        engine.cancel()
+        worker.join()
+
+    # Falha da transferência não é cancelamento: 1 para erro, 130 só para Ctrl+C
+    if 'error' in result:
+        return 1
+    return 130 if result.get('cancelled', False) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Detecção de músicas já existentes na playlist de destino (modo merge).
+
+Uma música é considerada repetida quando o nome dela está contido no
+título de uma música existente ou vice-versa. Em vez de comparar com
+todas as músicas da playlist, o índice usa hashes exatos e trigramas
+para chegar a poucos candidatos antes de verificar a substring.
+"""
+
+from collections import defaultdict
+
+from normalize import normalize
+
+GRAM = 3
+
+
+def _grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def playlist_rows(yt_playlist):
+    """Músicas de uma resposta de `get_playlist` como [titulo, artistas, videoId, setVideoId]."""
+    rows = []
+    for track in (yt_playlist or {}).get('tracks') or []:
+        if track and track.get('title'):
+            artists = ", ".join(a['name'] for a in track.get('artists') or [])
+            rows.append([track['title'], artists, track.get('videoId'), track.get('setVideoId')])
+    return rows
+
+
+class ExistingTrackIndex:
+    """Índice das músicas de uma playlist do YouTube Music."""
+
+    def __init__(self):
+        self.keys = set()                 # 'titulo|artistas' normalizados
+        self.titles = set()
+        self.video_ids = set()
+        self._postings = defaultdict(set)   # trigrama -> títulos que o contêm
+        self._by_head = defaultdict(set)    # primeiro trigrama -> títulos
+        self._short = set()                 # títulos menores que um trigrama
+
+    @classmethod
+    def from_playlist(cls, yt_playlist):
+        """Constrói o índice a partir da resposta de `get_playlist`."""
+        return cls.from_rows(playlist_rows(yt_playlist))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Constrói o índice a partir de linhas [titulo, artistas, videoId, setVideoId]."""
+        index = cls()
+        for title, artists, video_id, _ in rows:
+            index.add(title, artists, video_id)
+        return index
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, title, artists, video_id=None):
+        title = normalize(title)
+        self.keys.add(f"{title}|{normalize(artists)}")
+        if video_id:
+            self.video_ids.add(video_id)
+        if not title or title in self.titles:
+            return
+        self.titles.add(title)
+        if len(title) < GRAM:
+            self._short.add(title)
+            return
+        self._by_head[title[:GRAM]].add(title)
+        for gram in _grams(title):
+            self._postings[gram].add(title)
+
+    def contains(self, track):
+        """True se a música (Track) já existe (nome contido no título ou vice-versa)."""
+        if track.key in self.keys:
+            return True
+        name = normalize(track.name)
+        if not self.titles:
+            return False
+        if not name or name in self.titles:
+            return True
+        return self._name_in_title(name) or self._title_in_name(name)
+
+    def _name_in_title(self, name):
+        if len(name) < GRAM:
+            # Nomes muito curtos são raros: comparação direta
+            return any(name in title for title in self.titles)
+        # Um título que contém o nome contém todos os trigramas do nome
+        postings = sorted((self._postings.get(g, ()) for g in _grams(name)), key=len)
+        if not postings[0]:
+            return False
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if len(candidates) <= 8:
+                break
+            candidates &= posting
+            if not candidates:
+                return False
+        return any(name in title for title in candidates)
+
+    def _title_in_name(self, name):
+        if any(title in name for title in self._short):
+            return True
+        # Um título contido no nome começa em alguma posição do nome
+        for i in range(len(name) - GRAM + 1):
+            for title in self._by_head.get(name[i:i + GRAM], ()):
+                if name.startswith(title, i):
+                    return True
+        return False
@@ -0,0 +1,679 @@
+"""
+Motor de transferência Spotify -> YouTube Music, independente da interface.
+
+Usado tanto pela interface gráfica (gui.py) quanto pela linha de comando
+(cli.py). Não importa tkinter/customtkinter: o progresso é publicado
+através de um callback `emit(evento, **dados)`, com os eventos:
+
+- log:      message
+- status:   message (fase atual da transferência)
+- progress: playlist_index, playlist_total, name, done, total, track
+- current:  message (o que está sendo feito agora)
+- summary:  name, playlist_id, added, previously_added, failed, skipped, not_found,
+            search_errors
+- report:   path (relatório de desempenho gravado no fim da execução; ver metrics.py)
+"""
+
+import hashlib
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+
+from cache import MISS, LibraryPlaylistCache, PlaylistCache, SearchCache, SnapshotCache
+from dedup import ExistingTrackIndex, playlist_rows
+from journal import TransferJournal
+from library import LibraryIndex
+from metrics import Metrics
+from models import Track, YTPlaylist
+from pipeline import PlaylistWriter, batch_succeeded
+from ratelimit import AdaptiveRateLimiter, record_retry_after
+from search import SearchEngine, SingleFlight
+import spotify
+
+PARALLEL_PLAYLISTS = 3  # playlists transferidas ao mesmo tempo
+IMPORT_WORKERS = 4      # CSVs lidos ao mesmo tempo
+FIRST_PAGE = 25         # playlists da biblioteca exibidas antes da lista completa
+
+_playlist_cache = None
+_playlist_cache_lock = threading.Lock()
+
+
+def playlist_cache():
+    """Cache das playlists do Spotify (aberto no primeiro uso, compartilhado)."""
+    global _playlist_cache
+    with _playlist_cache_lock:
+        if _playlist_cache is None:
+            _playlist_cache = PlaylistCache()
+        return _playlist_cache
+
+
+def make_playlist(name, tracks, filepath=None, source='csv'):
+    """Registro de uma playlist importada, pronto para transferir."""
+    return {
+        'name': name,
+        'filepath': filepath,
+        'tracks': tracks,
+        'tracks_total': len(tracks),
+        'target': None,  # Será definido: 'new' ou 'merge' (com target_id)
+        'target_name': None,
+        'source': source,
+    }
+
+
+def import_source(source, log=None):
+    """Importa um link do Spotify ou um CSV do Exportify."""
+    if os.path.isfile(source):
+        name, tracks = spotify.load_csv(source)
+        return make_playlist(name, tracks, filepath=source)
+
+    playlist_id = spotify.extract_playlist_id(source)
+    if not playlist_id:
+        raise ValueError(f"Link ou arquivo invalido: {source}")
+    name, tracks = spotify.fetch_playlist(playlist_id, log=log, cache=playlist_cache())
+    return make_playlist(name, tracks, source='spotify')
+
+
+def load_csv_file(filepath):
+    """Lê um CSV numa única passada; retorna (playlist, sha1 do conteúdo)."""
+    digest = hashlib.sha1()
+
+    def lines():
+        with open(filepath, 'rb') as f:
+            for line in f:
+                digest.update(line)
+                yield line.decode('utf-8')
+
+    tracks = list(spotify.parse_csv(lines()))
+    return make_playlist(Path(filepath).stem, tracks, filepath=filepath), digest.hexdigest()
+
+
+def _load_all(load, sources, workers):
+    """Roda load(fonte) em threads; gera (fonte, playlist, erro) conforme cada uma termina."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(load, source): source for source in sources}
+        for future in as_completed(futures):
+            try:
+                playlist, error = future.result(), None
+            except Exception as e:
+                playlist, error = None, e
+            yield futures[future], playlist, error
+
+
+def import_csv_files(filepaths, manifest=None, workers=IMPORT_WORKERS):
+    """Lê vários CSVs em threads; gera (arquivo, playlist, erro) conforme cada um termina.
+
+    As threads sobrepõem a leitura dos arquivos; o parse em si roda sob o
+    GIL, um arquivo por vez. Com `manifest`, os arquivos lidos são
+    registrados nele e os que não mudaram desde a última importação são
+    carregados das músicas guardadas, sem ler o CSV de novo.
+    """
+    def load(filepath):
+        cached = manifest.cached(filepath) if manifest else None
+        if cached is not None:
+            return make_playlist(Path(filepath).stem, [Track(name, artists) for name, artists in cached],
+                                 filepath=filepath)
+        playlist, sha1 = load_csv_file(filepath)
+        if manifest and playlist['tracks']:
+            manifest.record(filepath, sha1, playlist['tracks'])
+        return playlist
+
+    return _load_all(load, filepaths, workers)
+
+
+def import_links(links, log=None, workers=spotify.FETCH_WORKERS):
+    """Importa vários links do Spotify em paralelo; gera (link, playlist, erro) conforme terminam."""
+    def load(link):
+        playlist_id = spotify.extract_playlist_id(link)
+        if not playlist_id:
+            raise ValueError("Link invalido")
+        prefixed = (lambda message: log(f"[{playlist_id}] {message}")) if log else None
+        name, tracks = spotify.fetch_playlist(playlist_id, log=prefixed, cache=playlist_cache())
+        return make_playlist(name, tracks, source='spotify')
+
+    return _load_all(load, links, workers)
+
+
+def merge_groups(playlists):
+    """Agrupa [(índice, playlist)] por playlist de destino do merge.
+
+    Cada playlist nova forma um grupo sozinha; as que fazem merge no mesmo
+    destino ficam juntas, na ordem original.
+    """
+    groups = []
+    by_target = {}
+    for pl_idx, playlist in enumerate(playlists):
+        target_id = playlist.get('target_id') if playlist.get('target') == 'merge' else None
+        if target_id is None:
+            groups.append([(pl_idx, playlist)])
+        elif target_id in by_target:
+            by_target[target_id].append((pl_idx, playlist))
+        else:
+            by_target[target_id] = [(pl_idx, playlist)]
+            groups.append(by_target[target_id])
+    return groups
+
+
+def connect(auth_file):
+    """Conecta ao YouTube Music com oauth.json ou browser_headers.json."""
+    import requests
+    from ytmusicapi import YTMusic
+
+    # Sessão própria só para ler o Retry-After (o ytmusicapi não anexa a resposta à exceção)
+    session = requests.Session()
+    session.request = partial(session.request, timeout=30)  # mesmo timeout da sessão padrão
+    session.hooks['response'].append(record_retry_after)
+    return YTMusic(auth_file, requests_session=session)
+
+
+class TransferEngine:
+    """Busca as músicas e grava nas playlists do YouTube Music."""
+
+    def __init__(self, ytm=None, emit=None, parallel=PARALLEL_PLAYLISTS):
+        self.ytm = ytm
+        self.parallel = parallel
+        self.emit = emit or (lambda kind, **data: None)
+        self.cancelled = False
+        self.search_cache = SearchCache()
+        # Um único limitador para todas as chamadas ao YouTube Music
+        self.limiter = AdaptiveRateLimiter()
+        self.search_engine = SearchEngine(self.search_song)
+        self.single_flight = SingleFlight()
+        self.library = None  # índice local opcional (LibraryIndex)
+        self.playlist_list = LibraryPlaylistCache()
+        self.snapshots = SnapshotCache()
+        self.metrics = Metrics()
+        self._limiter_base = (0, 0)
+        self.touched = set()  # playlists do YouTube Music alteradas na última execução
+
+    def log(self, message):
+        self.emit('log', message=message)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def pending_journals(self, playlists):
+        """Playlists com transferência interrompida que pode ser retomada."""
+        return [p for p in playlists if TransferJournal.for_playlist(p).pending]
+
+    def transfer(self, playlists, resume=False):
+        """Transfere as playlists; retorna True se foi cancelada.
+
+        Até `parallel` playlists andam ao mesmo tempo, dividindo o mesmo
+        limitador e o mesmo pool de buscas (atendidas em rodízio). Playlists
+        com merge na mesma playlist de destino rodam uma depois da outra,
+        para que cada uma veja o que a anterior adicionou.
+        """
+        self.start_run()
+        total_playlists = len(playlists)
+
+        def run(group):
+            for pl_idx, playlist in group:
+                if self.cancelled:
+                    return
+                try:
+                    self.transfer_playlist(playlist, pl_idx, total_playlists, resume)
+                except Exception as e:
+                    # Uma playlist com problema não derruba as outras
+                    self.log(f"Erro ao transferir '{playlist['name']}': {e}")
+
+        with ThreadPoolExecutor(max_workers=max(1, self.parallel)) as pool:
+            for group in merge_groups(playlists):
+                pool.submit(run, group)
+
+        self.log_run_stats()
+        self.write_report()
+        return self.cancelled
+
+    def start_run(self):
+        self.cancelled = False
+        # Buscas iguais entre as playlists desta execução são feitas uma vez só
+        self.single_flight = SingleFlight()
+        self.touched = set()
+        self.metrics = Metrics()
+        # Contadores do limitador são acumulados: o relatório usa a diferença
+        self._limiter_base = (self.limiter.retries, self.limiter.throttled)
+        if self.library:
+            self.library.hits = 0
+
+    def log_run_stats(self):
+        if self.library and self.library.hits:
+            self.log(f"Encontradas na biblioteca local: {self.library.hits}")
+        # Contadores desta execução (o cache e o limitador vivem entre execuções)
+        hits = self.metrics.value('search_cache_hits')
+        misses = self.metrics.value('search_cache_misses')
+        rate = hits / (hits + misses) if hits + misses else 0.0
+        self.log(f"Cache de buscas: {hits} acertos, {misses} falhas ({rate:.0%})")
+        if self.single_flight.shared:
+            self.log(f"Buscas repetidas reaproveitadas: {self.single_flight.shared}")
+        throttled = self.limiter.throttled - self._limiter_base[1]
+        if throttled:
+            self.log(f"Limite do YouTube Music atingido {throttled}x; "
+                     f"ritmo final: {self.limiter.rate:.1f} req/s")
+
+    def write_report(self):
+        """Grava o relatório de desempenho da execução em reports/."""
+        retries, throttled = self._limiter_base
+        self.metrics.count('retries', self.limiter.retries - retries)
+        self.metrics.count('throttled', self.limiter.throttled - throttled)
+        self.metrics.count('shared_searches', self.single_flight.shared)
+        report = self.metrics.report({'rate_limit_final': self.limiter.rate})
+        try:
+            path = self.metrics.write(report)
+        except OSError as e:
+            self.log(f"Aviso: nao foi possivel gravar o relatorio de desempenho: {e}")
+            return None
+        self.log(f"Relatorio de desempenho: {path} ({report['tracks_per_second']:.1f} musicas/s)")
+        self.emit('report', path=str(path))
+        return report
+
+    def transfer_playlist(self, playlist, pl_idx=0, total_playlists=1, resume=False):
+        self.log(f"\n{'='*40}")
+        self.log(f"Transferindo: {playlist['name']}")
+
+        # Com várias playlists em paralelo, as linhas do log se intercalam
+        def log(message):
+            self.log(f"[{playlist['name']}] {message}")
+
+        tracks = playlist['tracks']
+
+        if not tracks:
+            log("Playlist vazia, pulando...")
+            return
+
+        journal = TransferJournal.for_playlist(playlist)
+        if not (resume and journal.pending):
+            journal.discard()
+
+        # Verificar se é merge ou nova playlist
+        is_merge = playlist.get('target') == 'merge'
+        yt_playlist_id = playlist.get('target_id') if is_merge else None
+        existing_tracks = ExistingTrackIndex()
+
+        if is_merge and yt_playlist_id:
+            log(f"Modo: MERGE com '{playlist.get('target_name')}'")
+            self.emit('status', message="Carregando musicas existentes...")
+
+            # Carregar músicas existentes da playlist
+            try:
+                existing_tracks = self.load_merge_target(yt_playlist_id, log)
+                log(f"Musicas existentes na playlist: {len(existing_tracks)}")
+            except Exception as e:
+                log(f"Erro ao carregar playlist existente: {e}")
+        elif journal.pending:
+            yt_playlist_id = journal.playlist_id
+            log("Modo: NOVA PLAYLIST (retomando playlist ja criada)")
+        else:
+            # Criar nova playlist
+            log("Modo: NOVA PLAYLIST")
+            self.emit('status', message="Criando playlist no YouTube Music...")
+
+            try:
+                yt_playlist_id = self.limiter.call_write(
+                    self.metrics.timed('create_playlist', self.ytm.create_playlist), playlist['name'],
+                    f"Importada do Spotify - {len(tracks)} musicas"
+                )
+                log("Playlist criada no YouTube Music")
+            except Exception as e:
+                log(f"Erro ao criar playlist: {e}")
+                return
+
+        if journal.pending:
+            log(f"Retomando: {len(journal.committed)} ja adicionadas, {len(journal.resolved)} ja buscadas")
+            # Vídeos gravados na execução anterior já estão na playlist
+            existing_tracks.video_ids.update(journal.resolved[i] for i in journal.committed
+                                             if journal.resolved.get(i))
+        else:
+            journal.start(playlist, yt_playlist_id)
+
+        # Buscar e adicionar músicas
+        not_found = []
+        search_errors = []
+        skipped = []
+        total_tracks = len(tracks)
+        previously_added = 0
+
+        # Verificar se já existe (para merge) antes de buscar
+        to_search = []
+        for i, track in enumerate(tracks):
+            if i in journal.committed:
+                previously_added += 1
+                continue
+            # Verificação flexível pelo índice (título contido no nome ou vice-versa)
+            if is_merge and existing_tracks.contains(track):
+                skipped.append(str(track))
+                continue
+            to_search.append((i, track))
+
+        done = previously_added + len(skipped)
+        self.emit('progress', playlist_index=pl_idx, playlist_total=total_playlists,
+                  name=playlist['name'], done=done, total=total_tracks, track="")
+
+        # Gravar na playlist em lotes enquanto a busca continua
+        added_tracks = {}  # videoId -> música, para atualizar a cópia local do merge
+        writer = PlaylistWriter(
+            self.snapshot_writer(added_tracks) if is_merge else self.add_playlist_items, yt_playlist_id,
+            on_commit=journal.record_committed,
+            on_error=lambda e: log(f"Erro ao adicionar musicas: {e}")
+        )
+
+        # Músicas já resolvidas numa execução anterior não são buscadas de novo
+        results = self.search_engine.search_ordered(
+            (track for i, track in to_search if i not in journal.resolved),
+            should_cancel=lambda: self.cancelled,
+            flow=pl_idx
+        )
+        for i, track in to_search:
+            if self.cancelled:
+                break
+            if i in journal.resolved:
+                video_id, error = journal.resolved[i], None
+            else:
+                result = next(results, None)
+                if result is None:
+                    break
+                _, video_id, error = result
+                if error is not None:
+                    # Sem registro no diário: a música será buscada de novo ao retomar
+                    search_errors.append(str(track))
+                    log(f"Erro na busca de '{track.name}': {error}")
+                else:
+                    journal.record_resolved(i, video_id)
+
+            done += 1
+            self.metrics.count('tracks')
+            self.emit('progress', playlist_index=pl_idx, playlist_total=total_playlists,
+                      name=playlist['name'], done=done, total=total_tracks, track=str(track))
+
+            if video_id and video_id in existing_tracks.video_ids:
+                # Mesmo vídeo já na playlist ou na fila (linha repetida ou nome diferente):
+                # o YouTube Music recusa o lote inteiro se um videoId vier repetido
+                skipped.append(str(track))
+            elif video_id:
+                existing_tracks.video_ids.add(video_id)
+                added_tracks[video_id] = track
+                writer.put(video_id, i)
+            elif error is None:
+                not_found.append(str(track))
+        results.close()
+
+        # Gravar o lote final (também no cancelamento: o que foi encontrado permanece)
+        self.emit('current', message="Adicionando musicas a playlist...")
+        writer.close()
+
+        # Verificar cancelamento (o diário fica para poder retomar)
+        if self.cancelled:
+            journal.close()
+            log(f"Cancelado. {writer.added} musicas foram adicionadas antes do cancelamento.")
+            return
+
+        if writer.failed or search_errors:
+            journal.close()
+        else:
+            journal.discard()
+
+        # Resumo
+        summary = f"Adicionadas: {writer.added}"
+        if previously_added:
+            summary += f" (+{previously_added} na execucao anterior)"
+        if writer.failed:
+            summary += f", Falha ao adicionar: {writer.failed}"
+        if skipped:
+            summary += f", Ja existiam: {len(skipped)}"
+        if not_found:
+            summary += f", Nao encontradas: {len(not_found)}"
+        if search_errors:
+            summary += f", Erro na busca: {len(search_errors)}"
+
+        log(summary)
+
+        if not_found and len(not_found) <= 5:
+            log(f"  Nao encontradas: {', '.join(not_found)}")
+
+        if yt_playlist_id:
+            self.touched.add(yt_playlist_id)
+        self.count_results(writer, len(skipped), not_found, search_errors)
+        self.emit('summary', name=playlist['name'], playlist_id=yt_playlist_id, added=writer.added,
+                  previously_added=previously_added, failed=writer.failed,
+                  skipped=len(skipped), not_found=not_found, search_errors=search_errors)
+
+    def fetch_and_transfer(self, playlist_id):
+        """Lê uma playlist do Spotify e transfere para uma playlist nova, sem passar pela lista.
+
+        A página do Spotify é baixada e analisada inteira antes da primeira
+        música, então a leitura não se sobrepõe às buscas: o tempo total é
+        leitura + busca. O que corre junto são as buscas e a gravação dos
+        lotes. Retorna True se foi cancelada.
+        """
+        self.start_run()
+        info = {}
+        feed = queue.Queue()
+        failure = []
+
+        def produce():
+            try:
+                with self.metrics.timer('spotify_fetch'):
+                    for track in spotify.iter_playlist(playlist_id, log=self.log, info=info, cache=playlist_cache()):
+                        if self.cancelled:
+                            break
+                        feed.put(track)
+            except Exception as e:
+                failure.append(e)
+            finally:
+                feed.put(None)
+
+        threading.Thread(target=produce, daemon=True).start()
+
+        def incoming():
+            while True:
+                track = feed.get()
+                if track is None:
+                    return
+                yield track
+
+        created_title = []
+
+        def create_playlist():
+            # Criada no primeiro lote; o nome pode ainda não ter chegado (oEmbed vem no fim)
+            created_title.append(info.get('name') or "Spotify Playlist")
+            return self.limiter.call_write(self.metrics.timed('create_playlist', self.ytm.create_playlist),
+                                           created_title[0], "Importada do Spotify")
+
+        self.log(f"\n{'='*40}")
+        self.log("Buscando playlist no Spotify e transferindo...")
+        writer = PlaylistWriter(self.add_playlist_items, create_playlist,
+                                on_error=lambda e: self.log(f"Erro ao adicionar musicas: {e}"))
+        seen = 0
+        queued = set()  # videoIds já enviados: repetidos fariam o lote ser recusado
+        skipped = []
+        not_found = []
+        search_errors = []
+        results = self.search_engine.search_ordered(incoming(), should_cancel=lambda: self.cancelled)
+        for track, video_id, error in results:
+            seen += 1
+            self.metrics.count('tracks')
+            self.emit('progress', playlist_index=0, playlist_total=1, name=info.get('name', ''),
+                      done=seen, total=seen + feed.qsize(), track=str(track))
+            if error is not None:
+                search_errors.append(str(track))
+                self.log(f"Erro na busca de '{track.name}': {error}")
+            elif video_id in queued:
+                skipped.append(str(track))
+            elif video_id:
+                queued.add(video_id)
+                writer.put(video_id)
+            else:
+                not_found.append(str(track))
+        results.close()
+
+        self.emit('current', message="Adicionando musicas a playlist...")
+        writer.close()
+
+        if failure:
+            self.log(f"Erro ao importar: {failure[0]}")
+        playlist_name = info.get('name', '')
+        summary = f"{playlist_name}: {seen} musicas lidas, Adicionadas: {writer.added}"
+        if writer.failed:
+            summary += f", Falha ao adicionar: {writer.failed}"
+        if skipped:
+            summary += f", Repetidas: {len(skipped)}"
+        if not_found:
+            summary += f", Nao encontradas: {len(not_found)}"
+        if search_errors:
+            summary += f", Erro na busca: {len(search_errors)}"
+        self.log(summary)
+        if not_found and len(not_found) <= 5:
+            self.log(f"  Nao encontradas: {', '.join(not_found)}")
+
+        playlist_id = None if callable(writer.playlist_id) else writer.playlist_id
+        if playlist_id:
+            self.touched.add(playlist_id)
+            if playlist_name and playlist_name != created_title[0]:
+                try:
+                    self.limiter.call_write(self.ytm.edit_playlist, playlist_id, title=playlist_name)
+                except Exception as e:
+                    self.log(f"Erro ao renomear a playlist para '{playlist_name}': {e}")
+        self.count_results(writer, len(skipped), not_found, search_errors)
+        self.emit('summary', name=playlist_name, playlist_id=playlist_id, added=writer.added,
+                  previously_added=0, failed=writer.failed, skipped=len(skipped),
+                  not_found=not_found, search_errors=search_errors)
+        self.log_run_stats()
+        self.write_report()
+        return self.cancelled
+
+    def count_results(self, writer, skipped, not_found, search_errors):
+        self.metrics.count('tracks_added', writer.added)
+        self.metrics.count('tracks_failed', writer.failed)
+        self.metrics.count('tracks_skipped', skipped)
+        self.metrics.count('tracks_not_found', len(not_found))
+        self.metrics.count('search_errors', len(search_errors))
+
+    def cached_library_playlists(self):
+        """Última lista de playlists da biblioteca salva em cache/."""
+        return [YTPlaylist(*row) for row in self.playlist_list.load()]
+
+    def iter_library_playlists(self, first_page=FIRST_PAGE):
+        """Gera a lista de playlists da biblioteca: primeiro página, depois completa.
+
+        A primeira página só é pedida quando ainda não há lista em cache
+        (para a tela não ficar vazia enquanto a lista completa chega).
+        """
+        limits = [None]
+        if first_page and not self.playlist_list.load():
+            limits.insert(0, first_page)
+        for limit in limits:
+            playlists = [YTPlaylist.from_api(pl)
+                         for pl in self.limiter.call(self.ytm.get_library_playlists, limit=limit) or []]
+            yield playlists
+            if limit is None or len(playlists) < limit:
+                # Lista completa (ou a biblioteca inteira coube na primeira página)
+                self.playlist_list.replace([(p.playlist_id, p.title, p.count) for p in playlists])
+                return
+
+    def refresh_playlists(self, playlist_ids):
+        """Relê título e contagem só das playlists indicadas (ex.: as alteradas)."""
+        refreshed = []
+        for playlist_id in playlist_ids:
+            data = self.limiter.call(self.ytm.get_playlist, playlist_id, limit=1) or {}
+            playlist = YTPlaylist(playlist_id, data.get('title') or 'Sem nome', data.get('trackCount'))
+            self.playlist_list.update(playlist.playlist_id, playlist.title, playlist.count)
+            refreshed.append(playlist)
+        return refreshed
+
+    def add_playlist_items(self, playlist_id, video_ids):
+        return self.limiter.call_write(self.metrics.timed('add_items', self.ytm.add_playlist_items),
+                                       playlist_id, video_ids)
+
+    def load_merge_target(self, playlist_id, log):
+        """Índice das músicas da playlist de destino, pela cópia local se ainda valer.
+
+        A cópia é conferida com uma requisição só (primeira página): o total
+        de músicas e os setVideoIds dessa página precisam bater. Senão a
+        cópia é refeita: com a própria primeira página, se ela já tem todas
+        as músicas, ou baixando a playlist inteira.
+        """
+        with self.metrics.timer('merge_load'):
+            return self._load_merge_target(playlist_id, log)
+
+    def _load_merge_target(self, playlist_id, log):
+        rows = self.snapshots.get(playlist_id)
+        head = None
+        if rows is not None:
+            head = self.limiter.call(self.ytm.get_playlist, playlist_id, limit=1) or {}
+            known = {row[3] for row in rows}
+            if (head.get('trackCount') is not None
+                    and head['trackCount'] == self.snapshots.track_count(playlist_id)
+                    and all(row[3] in known for row in playlist_rows(head))):
+                log("Usando copia local da playlist de destino")
+                self.metrics.count('snapshot_hits')
+                return ExistingTrackIndex.from_rows(rows)
+            log("Playlist de destino mudou; atualizando a copia local")
+        self.metrics.count('snapshot_misses')
+        if head and head.get('trackCount') is not None and len(head.get('tracks') or []) >= head['trackCount']:
+            # A primeira página já trouxe a playlist inteira: não baixa de novo
+            yt_playlist = head
+        else:
+            # O ytmusicapi não continua de uma resposta anterior: a primeira página vem de novo
+            yt_playlist = self.limiter.call(self.ytm.get_playlist, playlist_id, limit=None) or {}
+        rows = playlist_rows(yt_playlist)
+        self.snapshots.put(playlist_id, rows, yt_playlist.get('trackCount'))
+        return ExistingTrackIndex.from_rows(rows)
+
+    def snapshot_writer(self, added_tracks):
+        """add_playlist_items que também acrescenta as músicas à cópia local do merge."""
+        def add_items(playlist_id, video_ids):
+            result = self.add_playlist_items(playlist_id, video_ids)
+            if not batch_succeeded(result):
+                # Resultado incerto: a playlist será baixada de novo no próximo merge
+                self.snapshots.discard(playlist_id)
+                return result
+            set_ids = {r['videoId']: r.get('setVideoId')
+                       for r in result.get('playlistEditResults') or [] if r and r.get('videoId')}
+            self.snapshots.append(playlist_id, [
+                [added_tracks[v].name, added_tracks[v].artists, v, set_ids.get(v)] for v in video_ids
+            ])
+            return result
+        return add_items
+
+    def search_song(self, track):
+        """videoId da música (None = não encontrada); falhas levantam exceção."""
+        return self.single_flight.do(track.key, self._search_song, track)
+
+    def open_library(self):
+        """Passa a usar o índice local, se ele já foi construído; retorna o tamanho."""
+        index = LibraryIndex()
+        count = len(index)
+        self.library = index if count else None
+        return count
+
+    def build_library(self):
+        """(Re)constrói o índice local com a biblioteca e as playlists do usuário."""
+        index = self.library or LibraryIndex()
+        count = index.build(self.ytm, call=self.limiter.call, log=self.log)
+        self.library = index if count else None
+        self.log(f"Indice local da biblioteca: {count} musicas")
+        return count
+
+    def _search_song(self, track):
+        # Músicas que o usuário já tem não precisam de busca na rede
+        if self.library:
+            video_id = self.library.lookup(track)
+            if video_id:
+                self.metrics.count('library_hits')
+                return video_id
+
+        cached = self.search_cache.get(track.key)
+        if cached is not MISS:
+            self.metrics.count('search_cache_hits')
+            return cached
+        self.metrics.count('search_cache_misses')
+
+        # Falha de rede não é "não encontrada": a exceção sobe e nada vai para o cache
+        query = f"{track.name} {track.artists}"
+        # Só a requisição: a espera do limitador e o backoff ficam fora da latência
+        results = self.limiter.call(self.metrics.timed('search', self.ytm.search), query, filter='songs', limit=1)
+        video_id = results[0].get('videoId') if results else None
+        self.search_cache.put(track.key, video_id)
+        return video_id
@@ -6,32 +6,42 @@ Interface gráfica para transferir playlists do Spotify (via link ou CSV)
 para o YouTube Music, com suporte a merge de playlists existentes.
 """
 
-import csv
+import time
+
+_STARTED = time.perf_counter()  # referência para o benchmark de inicialização
+
 import json
 import os
 import re
 import threading
-import time
 from pathlib import Path
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
-from ytmusicapi import YTMusic
 
-import requests
+# ytmusicapi e requests são importados só quando usados (conexão/importação)
+from cache import ImportManifest
+import spotify
+from engine import TransferEngine, connect, import_csv_files, import_links, make_playlist
+from logbuffer import LOG_LINES, LOG_REFRESH_MS, LogBuffer, log_to_file
+from progress import UI_TICK_MS, ProgressChannel
+from widgets import PrefixIndex, VirtualList
+
+_IMPORTED = time.perf_counter()
 
 # Configuração do tema
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
 class SpotifyLinkDialog(ctk.CTkToplevel):
-    """Dialog para importar playlist via link do Spotify."""
+    """Dialog para importar uma ou mais playlists via link do Spotify."""
 
-    def __init__(self, parent, callback):
+    def __init__(self, parent, callback, can_transfer=False):
         super().__init__(parent)
         self.callback = callback
+        self.can_transfer = can_transfer
 
-        self.title("Importar Playlist do Spotify")
-        self.geometry("550x200")
+        self.title("Importar Playlists do Spotify")
+        self.geometry("550x330")
         self.resizable(False, False)
 
         self.transient(parent)
@@ -42,7 +52,7 @@ class SpotifyLinkDialog(ctk.CTkToplevel):
     def setup_ui(self):
         ctk.CTkLabel(
             self,
-            text="Cole o link da playlist do Spotify:",
+            text="Cole os links das playlists do Spotify (um por linha):",
             font=ctk.CTkFont(size=14, weight="bold")
         ).pack(pady=(20, 10))
 
@@ -53,8 +63,9 @@ class SpotifyLinkDialog(ctk.CTkToplevel):
             text_color="gray"
         ).pack(pady=(0, 10))
 
-        self.link_entry = ctk.CTkEntry(self, width=500, placeholder_text="https://open.spotify.com/playlist/...")
-        self.link_entry.pack(padx=20)
+        self.link_text = ctk.CTkTextbox(self, width=500, height=130)
+        self.link_text.pack(padx=20)
+        self.link_text.focus_set()
 
         btn_frame = ctk.CTkFrame(self, fg_color="transparent")
         btn_frame.pack(fill="x", padx=20, pady=20)
@@ -62,12 +73,21 @@ class SpotifyLinkDialog(ctk.CTkToplevel):
         ctk.CTkButton(btn_frame, text="Cancelar", command=self.cancel, fg_color="gray40", width=100).pack(side="left")
         ctk.CTkButton(btn_frame, text="Importar", command=self.submit, width=100).pack(side="right")
 
-    def submit(self):
-        link = self.link_entry.get().strip()
-        if not link or "spotify.com" not in link:
-            messagebox.showerror("Erro", "Cole um link válido do Spotify")
+        # Lê e transfere direto (um link, nova playlist); exige YouTube Music conectado
+        ctk.CTkButton(
+            btn_frame, text="Buscar e Transferir", command=lambda: self.submit(transfer=True), width=140,
+            state="normal" if self.can_transfer else "disabled"
+        ).pack(side="right", padx=10)
+
+    def submit(self, transfer=False):
+        links = [link for link in self.link_text.get("1.0", "end").split() if link]
+        if not links or any("spotify.com" not in link for link in links):
+            messagebox.showerror("Erro", "Cole links válidos do Spotify")
             return
-        self.callback(link)
+        if transfer and len(links) > 1:
+            messagebox.showerror("Erro", "Buscar e Transferir aceita um link por vez")
+            return
+        self.callback(links, transfer)
         self.destroy()
 
     def cancel(self):
@@ -206,10 +226,9 @@ class PlaylistSelectDialog(ctk.CTkToplevel):
         self.csv_playlist = csv_playlist
         self.yt_playlists = yt_playlists
         self.selected_playlist = None
-        self.playlist_checkboxes = []
 
         self.title(f"Destino: {csv_playlist['name']}")
-        self.geometry("520x550")
+        self.geometry("520x590")
         self.resizable(False, False)
 
         self.transient(parent)
@@ -283,30 +302,21 @@ class PlaylistSelectDialog(ctk.CTkToplevel):
         )
         self.playlists_label.pack(anchor="w", padx=25, pady=(10, 5))
 
-        self.playlist_scroll = ctk.CTkScrollableFrame(self, height=200)
-        self.playlist_scroll.pack(fill="x", padx=20, pady=5)
+        # Filtro por prefixo (digitar "roc na" encontra "Rock Nacional")
+        self.filter_entry = ctk.CTkEntry(self, placeholder_text="Filtrar playlists...")
+        self.filter_entry.pack(fill="x", padx=20, pady=(0, 5))
+        self.filter_entry.bind("<KeyRelease>", lambda e: self.apply_filter())
+        self.prefix_index = PrefixIndex([pl.title for pl in self.yt_playlists])
 
         self.playlist_var = ctk.StringVar(value="")
 
-        if not self.yt_playlists:
-            ctk.CTkLabel(
-                self.playlist_scroll,
-                text="Nenhuma playlist encontrada",
-                text_color="gray"
-            ).pack(pady=20)
-        else:
-            for pl in self.yt_playlists:
-                cb = ctk.CTkCheckBox(
-                    self.playlist_scroll,
-                    text=f"{pl['title']} ({pl.get('count', '?')} musicas)",
-                    font=ctk.CTkFont(size=12),
-                    command=lambda pid=pl['playlistId']: self.on_playlist_selected(pid),
-                    checkbox_width=20,
-                    checkbox_height=20,
-                    border_width=2
-                )
-                cb.pack(anchor="w", pady=3)
-                self.playlist_checkboxes.append((cb, pl['playlistId'], pl['title']))
+        self.playlist_list = VirtualList(
+            self, row_height=30, height=200,
+            create_row=self.create_playlist_row, bind_row=self.bind_playlist_row,
+            empty_text="Nenhuma playlist encontrada"
+        )
+        self.playlist_list.pack(fill="x", padx=20, pady=5)
+        self.playlist_list.set_items(self.yt_playlists)
 
         # Iniciar com playlists desabilitadas
         self.update_playlist_state()
@@ -325,14 +335,42 @@ class PlaylistSelectDialog(ctk.CTkToplevel):
             width=100
         ).pack(side="right")
 
+    def create_playlist_row(self, parent):
+        cb = ctk.CTkCheckBox(
+            parent,
+            text="",
+            font=ctk.CTkFont(size=12),
+            checkbox_width=20,
+            checkbox_height=20,
+            border_width=2
+        )
+        cb.configure(command=lambda: self.on_playlist_selected(cb.playlist_id, cb.get()))
+        return cb
+
+    def bind_playlist_row(self, cb, pl, index):
+        cb.playlist_id = pl.playlist_id
+        cb.configure(text=f"{pl.title} ({pl.count_text} musicas)")
+        if pl.playlist_id == self.playlist_var.get():
+            cb.select()
+        else:
+            cb.deselect()
+        if self.choice_var.get() == "merge":
+            cb.configure(state="normal", text_color=("gray10", "gray90"))
+        else:
+            cb.configure(state="disabled", text_color="gray50")
+
+    def apply_filter(self):
+        """Mostra só as playlists que casam com o texto do filtro."""
+        indexes = self.prefix_index.search(self.filter_entry.get())
+        self.playlist_list.set_items([self.yt_playlists[i] for i in indexes])
+
     def on_new_selected(self):
         """Quando 'Criar nova' é selecionado."""
         if self.new_cb.get():
             self.merge_cb.deselect()
             self.choice_var.set("new")
             # Desmarcar todas as playlists
-            for cb, _, _ in self.playlist_checkboxes:
-                cb.deselect()
+            self.playlist_var.set("")
             self.update_playlist_state()
 
     def on_merge_selected(self):
@@ -347,34 +385,21 @@ class PlaylistSelectDialog(ctk.CTkToplevel):
             self.choice_var.set("new")
             self.update_playlist_state()
 
-    def on_playlist_selected(self, playlist_id):
-        """Quando uma playlist é selecionada."""
-        # Desmarcar outras playlists (apenas uma pode ser selecionada)
-        for cb, pid, _ in self.playlist_checkboxes:
-            if pid != playlist_id:
-                cb.deselect()
-            elif cb.get():
-                self.playlist_var.set(playlist_id)
-                # Marcar merge automaticamente
-                self.merge_cb.select()
-                self.new_cb.deselect()
-                self.choice_var.set("merge")
-
-        # Se nenhuma está selecionada, limpar
-        any_selected = any(cb.get() for cb, _, _ in self.playlist_checkboxes)
-        if not any_selected:
+    def on_playlist_selected(self, playlist_id, checked):
+        """Quando uma playlist é selecionada (apenas uma pode ser selecionada)."""
+        if checked:
+            self.playlist_var.set(playlist_id)
+            # Marcar merge automaticamente
+            self.merge_cb.select()
+            self.new_cb.deselect()
+            self.choice_var.set("merge")
+        else:
             self.playlist_var.set("")
+        self.update_playlist_state()
 
     def update_playlist_state(self):
         """Atualiza estado visual das playlists (habilitado/desabilitado)."""
-        is_merge = self.choice_var.get() == "merge"
-
-        for cb, _, _ in self.playlist_checkboxes:
-            if is_merge:
-                cb.configure(state="normal", text_color=("gray10", "gray90"))
-            else:
-                cb.configure(state="disabled", text_color="gray50")
-                cb.deselect()
+        self.playlist_list.refresh()
 
     def submit(self):
         choice = self.choice_var.get()
@@ -385,7 +410,7 @@ class PlaylistSelectDialog(ctk.CTkToplevel):
                 messagebox.showwarning("Aviso", "Selecione uma playlist para fazer merge")
                 return
             # Encontrar o nome da playlist
-            playlist_name = next((p['title'] for p in self.yt_playlists if p['playlistId'] == playlist_id), "")
+            playlist_name = next((p.title for p in self.yt_playlists if p.playlist_id == playlist_id), "")
             self.callback("merge", playlist_id, playlist_name)
         else:
             self.callback("new", None, None)
@@ -405,13 +430,29 @@ class SpotifyYTMusicApp(ctk.CTk):
         self.geometry("900x750")
         self.minsize(800, 650)
 
-        self.ytm = None
+        self.engine = TransferEngine(emit=self.on_engine_event)
         self.csv_files = []
         self.yt_playlists = []
         self.is_transferring = False
-        self.cancel_transfer = False
+        self.transfer_playlists = []
+        self.ytm_tab_ready = False
+        self.ytm_loading = False
+        self.library_building = False
+        self.channel = ProgressChannel()
+        self.log_buffer = LogBuffer()
+        self.log_line_count = 0
+        self.log_flush_scheduled = False
 
         self.setup_ui()
+        self.after(UI_TICK_MS, self.drain_channel)
+
+    @property
+    def ytm(self):
+        return self.engine.ytm
+
+    @ytm.setter
+    def ytm(self, value):
+        self.engine.ytm = value
 
     def setup_ui(self):
         self.grid_columnconfigure(0, weight=1)
@@ -442,6 +483,9 @@ class SpotifyYTMusicApp(ctk.CTk):
         self.link_btn = ctk.CTkButton(spotify_frame, text="Link Spotify", command=self.import_spotify_link, width=100)
         self.link_btn.pack(side="right", padx=5, pady=5)
 
+        self.folder_btn = ctk.CTkButton(spotify_frame, text="Pasta", command=self.import_csv_folder, width=60, fg_color="gray40")
+        self.folder_btn.pack(side="right", padx=5, pady=5)
+
         self.csv_btn = ctk.CTkButton(spotify_frame, text="CSV", command=self.import_csv, width=60, fg_color="gray40")
         self.csv_btn.pack(side="right", padx=5, pady=5)
 
@@ -456,14 +500,14 @@ class SpotifyYTMusicApp(ctk.CTk):
         self.ytm_btn.pack(side="right", padx=10, pady=5)
 
         # === Main Content - Tabview ===
-        self.tabview = ctk.CTkTabview(self)
+        self.tabview = ctk.CTkTabview(self, command=self.on_tab_changed)
         self.tabview.grid(row=2, column=0, padx=20, pady=10, sticky="nsew")
 
         self.tab_csv = self.tabview.add("Spotify")
         self.tab_ytm = self.tabview.add("YouTube Music")
 
+        # A aba do YouTube Music só é montada quando exibida pela primeira vez
         self.setup_csv_tab()
-        self.setup_ytm_tab()
 
         # === Progress Section ===
         progress_frame = ctk.CTkFrame(self)
@@ -519,20 +563,12 @@ class SpotifyYTMusicApp(ctk.CTk):
         ctk.CTkCheckBox(header, text="Selecionar Todas", variable=self.select_all_var, command=self.toggle_select_all).pack(side="right", padx=20)
 
         # Lista
-        self.csv_scroll = ctk.CTkScrollableFrame(self.tab_csv)
-        self.csv_scroll.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
-        self.csv_scroll.grid_columnconfigure(0, weight=1)
-
-        self.playlist_checkboxes = []
-        self.playlist_vars = []
-
-        self.csv_placeholder = ctk.CTkLabel(
-            self.csv_scroll,
-            text="Importe playlists usando o botao 'Link Spotify'\nou CSV do Exportify (exportify.app)",
-            font=ctk.CTkFont(size=14),
-            text_color="gray"
+        self.csv_list = VirtualList(
+            self.tab_csv, row_height=44,
+            create_row=self.create_csv_row, bind_row=self.bind_csv_row,
+            empty_text="Importe playlists usando o botao 'Link Spotify'\nou CSV do Exportify (exportify.app)"
         )
-        self.csv_placeholder.grid(row=0, column=0, pady=50)
+        self.csv_list.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
 
     def setup_ytm_tab(self):
         """Configura a aba do YouTube Music."""
@@ -545,24 +581,86 @@ class SpotifyYTMusicApp(ctk.CTk):
 
         ctk.CTkLabel(header, text="Suas Playlists no YouTube Music", font=ctk.CTkFont(size=16, weight="bold")).pack(side="left")
 
-        self.refresh_ytm_btn = ctk.CTkButton(header, text="Atualizar", command=self.load_ytm_playlists, width=100, state="disabled")
+        self.refresh_ytm_btn = ctk.CTkButton(header, text="Atualizar", command=self.load_ytm_playlists, width=100)
         self.refresh_ytm_btn.pack(side="right")
 
+        # Índice local: músicas que já estão na conta não são buscadas de novo
+        self.library_btn = ctk.CTkButton(header, text="Indexar Biblioteca", command=self.build_library_index,
+                                         width=130, fg_color="gray40")
+        self.library_btn.pack(side="right", padx=10)
+
         # Lista
-        self.ytm_scroll = ctk.CTkScrollableFrame(self.tab_ytm)
-        self.ytm_scroll.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
-        self.ytm_scroll.grid_columnconfigure(0, weight=1)
-
-        self.ytm_placeholder = ctk.CTkLabel(
-            self.ytm_scroll,
-            text="Conecte-se ao YouTube Music para ver suas playlists",
-            font=ctk.CTkFont(size=14),
-            text_color="gray"
+        self.ytm_list = VirtualList(
+            self.tab_ytm, row_height=44,
+            create_row=self.create_ytm_row, bind_row=self.bind_ytm_row,
+            empty_text="Conecte-se ao YouTube Music para ver suas playlists"
         )
-        self.ytm_placeholder.grid(row=0, column=0, pady=50)
+        self.ytm_list.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
+
+        self.ytm_tab_ready = True
+        self.update_refresh_btn()
+        if self.ytm:
+            self.render_ytm_playlists()
+
+    def on_tab_changed(self):
+        if self.tabview.get() == "YouTube Music" and not self.ytm_tab_ready:
+            self.setup_ytm_tab()
+
+    def update_refresh_btn(self):
+        """Estado do botão 'Atualizar' (se a aba do YouTube Music já existe)."""
+        if not self.ytm_tab_ready:
+            return
+        if self.ytm_loading:
+            self.refresh_ytm_btn.configure(state="disabled", text="Carregando...")
+        else:
+            self.refresh_ytm_btn.configure(state="normal" if self.ytm else "disabled", text="Atualizar")
+        if self.library_building:
+            self.library_btn.configure(state="disabled", text="Indexando...")
+        else:
+            self.library_btn.configure(state="normal" if self.ytm else "disabled", text="Indexar Biblioteca")
+
+    def build_library_index(self):
+        """Constrói o índice local com a biblioteca e as playlists (em segundo plano)."""
+        if not self.ytm or self.library_building:
+            return
+        self.library_building = True
+        self.update_refresh_btn()
+
+        def do_build():
+            try:
+                self.engine.build_library()
+            except Exception as e:
+                self.channel.post(self.log, f"Erro ao indexar biblioteca: {e}")
+            finally:
+                self.channel.post(self.on_library_built)
+
+        threading.Thread(target=do_build, daemon=True).start()
+
+    def on_library_built(self):
+        self.library_building = False
+        self.update_refresh_btn()
 
     def log(self, message):
-        self.log_text.insert("end", f"{message}\n")
+        log_to_file(message)
+        self.log_buffer.append(message)
+        if not self.log_flush_scheduled:
+            self.log_flush_scheduled = True
+            self.after(LOG_REFRESH_MS, self.flush_log)
+
+    def flush_log(self):
+        """Exibe as linhas novas em lote e descarta as que passam de LOG_LINES."""
+        self.log_flush_scheduled = False
+        pending = self.log_buffer.take_pending()
+        if not pending:
+            return
+
+        text = "\n".join(pending) + "\n"
+        self.log_text.insert("end", text)
+        self.log_line_count += text.count("\n")
+        excess = self.log_line_count - LOG_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.log_line_count -= excess
         self.log_text.see("end")
 
     def import_csv(self):
@@ -573,303 +671,114 @@ class SpotifyYTMusicApp(ctk.CTk):
         )
         if not filepaths:
             return
-        for filepath in filepaths:
-            self.load_csv_file(filepath)
+        self.start_csv_import(filepaths)
+
+    def import_csv_folder(self):
+        """Importa todos os CSVs de uma pasta, pulando os que já estão na lista."""
+        folder = filedialog.askdirectory(
+            title="Selecione a pasta com os CSVs do Exportify",
+            initialdir=os.path.expanduser("~")
+        )
+        if not folder:
+            return
+        loaded = {os.path.abspath(pl['filepath']) for pl in self.csv_files if pl.get('filepath')}
+        filepaths = [str(p) for p in sorted(Path(folder).glob("*.csv")) if os.path.abspath(p) not in loaded]
+        if not filepaths:
+            self.log("Nenhum CSV novo na pasta")
+            return
+        self.start_csv_import(filepaths)
+
+    def start_csv_import(self, filepaths):
+        """Lê os CSVs em segundo plano; cada playlist aparece ao terminar de ler."""
+        self.csv_btn.configure(state="disabled")
+        self.folder_btn.configure(state="disabled")
+        self.log(f"Importando {len(filepaths)} arquivo(s) CSV...")
+
+        def do_csv_import():
+            manifest = ImportManifest()
+            loaded = 0
+            try:
+                for filepath, playlist, error in import_csv_files(filepaths, manifest):
+                    name = Path(filepath).name
+                    if error is not None:
+                        self.channel.post(self.log, f"Erro ao carregar {name}: {error}")
+                    elif not playlist['tracks']:
+                        self.channel.post(self.log, f"Aviso: Nenhuma musica encontrada em {name}")
+                    else:
+                        loaded += 1
+                        self.channel.post(self.add_csv_playlist, playlist)
+            finally:
+                manifest.close()
+                if manifest.hits:
+                    self.channel.post(self.log, f"{manifest.hits} arquivo(s) sem alteracao carregados do cache")
+                self.channel.post(self.on_csv_import_done, loaded)
+
+        threading.Thread(target=do_csv_import, daemon=True).start()
+
+    def add_csv_playlist(self, playlist):
+        self.csv_files.append(playlist)
+        self.log(f"Carregado: {playlist['name']} ({playlist['tracks_total']} musicas)")
         self.display_csv_playlists()
         self.check_ready()
 
+    def on_csv_import_done(self, loaded):
+        self.log(f"Importacao de CSV concluida: {loaded} playlist(s)")
+        if not self.is_transferring:
+            self.csv_btn.configure(state="normal")
+            self.folder_btn.configure(state="normal")
+
     def import_spotify_link(self):
         """Importa playlist via link do Spotify."""
-        SpotifyLinkDialog(self, self.on_spotify_link)
+        SpotifyLinkDialog(self, self.on_spotify_link, can_transfer=bool(self.ytm) and not self.is_transferring)
 
-    def on_spotify_link(self, link):
-        """Callback quando link do Spotify é fornecido."""
-        if not link:
+    def on_spotify_link(self, links, transfer=False):
+        """Callback quando os links do Spotify são fornecidos."""
+        if not links:
             return
 
-        # Extrair playlist ID
-        playlist_id = self.extract_spotify_playlist_id(link)
-        if not playlist_id:
-            messagebox.showerror("Erro", "Link inválido. Use um link de playlist do Spotify.")
+        if transfer:
+            # Extrair playlist ID
+            playlist_id = spotify.extract_playlist_id(links[0])
+            if not playlist_id:
+                messagebox.showerror("Erro", "Link inválido. Use um link de playlist do Spotify.")
+                return
+            self.start_stream_transfer(playlist_id)
             return
 
-        self.log(f"Importando playlist do Spotify...")
+        self.log(f"Importando {len(links)} playlist(s) do Spotify...")
         self.link_btn.configure(state="disabled", text="Carregando...")
 
         def do_import():
-            error_msg = None
+            failures = []
+            imported = 0
             try:
-                # Buscar dados da playlist via web scraping
-                playlist_name, tracks = self.fetch_spotify_playlist(playlist_id)
-
-                if not tracks:
-                    raise ValueError("Não foi possível obter as músicas da playlist.\nVerifique se a playlist é pública.")
-
-                # Adicionar à lista
-                self.csv_files.append({
-                    'name': playlist_name,
-                    'filepath': None,
-                    'tracks': tracks,
-                    'tracks_total': len(tracks),
-                    'target': None,
-                    'target_name': None,
-                    'source': 'spotify'
-                })
-
-                self.after(0, lambda n=playlist_name, t=len(tracks): self.log(f"Importado: {n} ({t} musicas)"))
-                self.after(0, self.display_csv_playlists)
-                self.after(0, self.check_ready)
-
-            except Exception as e:
-                error_msg = str(e)
-                self.after(0, lambda msg=error_msg: self.log(f"Erro ao importar: {msg}"))
-                self.after(0, lambda msg=error_msg: messagebox.showerror("Erro", f"Erro ao importar playlist:\n{msg}"))
+                # Os links são buscados em paralelo (com limite) numa sessão HTTP compartilhada
+                for link, playlist, error in import_links(links, log=lambda msg: self.channel.post(self.log, msg)):
+                    if error is None and not playlist['tracks']:
+                        error = "Nenhuma musica encontrada (a playlist e publica?)"
+                    if error is not None:
+                        failures.append((link, str(error).splitlines()[0]))
+                        self.channel.post(self.log, f"Erro ao importar {link}: {error}")
+                    else:
+                        imported += 1
+                        self.channel.post(self.add_csv_playlist, playlist)
             finally:
-                self.after(0, lambda: self.link_btn.configure(state="normal", text="Link Spotify"))
+                self.channel.post(self.on_links_imported, imported, failures)
 
         threading.Thread(target=do_import, daemon=True).start()
 
-    def fetch_spotify_playlist(self, playlist_id):
-        """Busca dados de uma playlist pública do Spotify usando o embed player."""
-        tracks = []
-        playlist_name = "Spotify Playlist"
-
-        session = requests.Session()
-
-        # Método 1: Usar o embed player do Spotify
-        try:
-            # O embed player carrega dados de playlists públicas
-            embed_url = f"https://open.spotify.com/embed/playlist/{playlist_id}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Referer': 'https://open.spotify.com/',
-            }
-
-            resp = session.get(embed_url, headers=headers, timeout=20)
-
-            if resp.status_code == 200:
-                html = resp.text
-
-                # O embed contém dados JSON no HTML
-                # Procurar por dados no script de inicialização
-                data_match = re.search(r'<script id="__NEXT_DATA__"[^>]*type="application/json">(.+?)</script>', html, re.DOTALL)
-                if data_match:
-                    try:
-                        data = json.loads(data_match.group(1))
-                        # Navegar pela estrutura do Next.js
-                        props = data.get('props', {}).get('pageProps', {})
-
-                        # Extrair nome da playlist
-                        if 'state' in props:
-                            state = props['state']
-                            if 'data' in state and 'entity' in state['data']:
-                                entity = state['data']['entity']
-                                playlist_name = entity.get('name', playlist_name)
-
-                                # Extrair tracks
-                                trackList = entity.get('trackList', [])
-                                for item in trackList:
-                                    track_name = item.get('title', '')
-                                    track_artists = item.get('subtitle', '')
-                                    if track_name:
-                                        tracks.append({'name': track_name, 'artists': track_artists})
-                    except (json.JSONDecodeError, KeyError) as e:
-                        self.after(0, lambda msg=str(e): self.log(f"Parse embed falhou: {msg}"))
-
-                # Fallback: procurar padrões alternativos no HTML do embed
-                if not tracks:
-                    # Procurar por "title" e "subtitle" (format do embed)
-                    pattern = r'"title"\s*:\s*"([^"]+)"\s*,\s*"subtitle"\s*:\s*"([^"]+)"'
-                    matches = re.findall(pattern, html)
-                    for title, subtitle in matches:
-                        if title and len(title) > 1 and subtitle:
-                            tracks.append({'name': title, 'artists': subtitle})
-
-                    # Procurar nome da playlist
-                    name_match = re.search(r'"name"\s*:\s*"([^"]{2,100})"[^}]*"type"\s*:\s*"playlist"', html)
-                    if name_match:
-                        playlist_name = name_match.group(1)
-
-        except Exception as e:
-            self.after(0, lambda msg=str(e): self.log(f"Embed falhou: {msg}"))
-
-        # Método 2: Tentar página normal com scraping mais agressivo
-        if not tracks:
-            self.after(0, lambda: self.log("Tentando scraping da pagina..."))
-            try:
-                url = f"https://open.spotify.com/playlist/{playlist_id}"
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'pt-BR,pt;q=0.8,en-US;q=0.5,en;q=0.3',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                }
-                resp = session.get(url, headers=headers, timeout=20)
-
-                if resp.status_code == 200:
-                    html = resp.text
-
-                    # Tentar extrair do __NEXT_DATA__
-                    next_match = re.search(r'<script id="__NEXT_DATA__"[^>]*>(.+?)</script>', html, re.DOTALL)
-                    if next_match:
-                        try:
-                            data = json.loads(next_match.group(1))
-                            playlist_name, tracks = self._parse_next_data(data)
-                        except:
-                            pass
-
-                    # Tentar application/ld+json (schema.org)
-                    if not tracks:
-                        ld_match = re.search(r'<script type="application/ld\+json">(.+?)</script>', html, re.DOTALL)
-                        if ld_match:
-                            try:
-                                ld_data = json.loads(ld_match.group(1))
-                                if ld_data.get('name'):
-                                    playlist_name = ld_data['name']
-                                for t in ld_data.get('track', []):
-                                    name = t.get('name', '')
-                                    artist = ''
-                                    if 'byArtist' in t:
-                                        ba = t['byArtist']
-                                        if isinstance(ba, dict):
-                                            artist = ba.get('name', '')
-                                        elif isinstance(ba, list):
-                                            artist = ", ".join([a.get('name', '') for a in ba])
-                                    if name:
-                                        tracks.append({'name': name, 'artists': artist})
-                            except:
-                                pass
-
-            except Exception as e:
-                self.after(0, lambda msg=str(e): self.log(f"Scraping falhou: {msg}"))
-
-        # Método 3: oembed para nome
-        if not playlist_name or playlist_name == "Spotify Playlist":
-            try:
-                oembed_url = f"https://open.spotify.com/oembed?url=https://open.spotify.com/playlist/{playlist_id}"
-                oembed_resp = session.get(oembed_url, timeout=10)
-                if oembed_resp.status_code == 200:
-                    playlist_name = oembed_resp.json().get('title', playlist_name)
-            except:
-                pass
-
-        # Remover duplicatas
-        if tracks:
-            seen = set()
-            unique = []
-            for t in tracks:
-                key = f"{t['name'].lower().strip()}|{t['artists'].lower().strip()}"
-                if key not in seen:
-                    seen.add(key)
-                    unique.append(t)
-            tracks = unique
-
-        if not tracks:
-            raise ValueError("Não foi possível encontrar dados da playlist.\nVerifique se a playlist é pública.")
-
-        return playlist_name, tracks
-
-    def _parse_next_data(self, data):
-        """Tenta extrair dados do __NEXT_DATA__ do Spotify."""
-        playlist_name = "Spotify Playlist"
-        tracks = []
-
-        # Navegar por diferentes estruturas possíveis
-        def find_tracks(obj, depth=0):
-            if depth > 10:
-                return []
-            found = []
-            if isinstance(obj, dict):
-                # Verificar se é um objeto de track
-                if 'name' in obj and 'artists' in obj and isinstance(obj.get('artists'), list):
-                    artists = ", ".join([a.get('name', '') for a in obj['artists'] if isinstance(a, dict)])
-                    if obj['name'] and artists:
-                        found.append({'name': obj['name'], 'artists': artists})
-
-                # Continuar buscando em sub-objetos
-                for key, value in obj.items():
-                    found.extend(find_tracks(value, depth + 1))
-
-            elif isinstance(obj, list):
-                for item in obj:
-                    found.extend(find_tracks(item, depth + 1))
-
-            return found
-
-        # Tentar encontrar o nome da playlist
-        def find_playlist_name(obj, depth=0):
-            if depth > 10:
-                return None
-            if isinstance(obj, dict):
-                if obj.get('__typename') == 'Playlist' and 'name' in obj:
-                    return obj['name']
-                if 'playlist' in obj and isinstance(obj['playlist'], dict) and 'name' in obj['playlist']:
-                    return obj['playlist']['name']
-                for value in obj.values():
-                    result = find_playlist_name(value, depth + 1)
-                    if result:
-                        return result
-            elif isinstance(obj, list):
-                for item in obj:
-                    result = find_playlist_name(item, depth + 1)
-                    if result:
-                        return result
-            return None
-
-        name = find_playlist_name(data)
-        if name:
-            playlist_name = name
-
-        tracks = find_tracks(data)
-
-        # Remover duplicatas mantendo ordem
-        seen = set()
-        unique_tracks = []
-        for t in tracks:
-            key = f"{t['name']}|{t['artists']}"
-            if key not in seen:
-                seen.add(key)
-                unique_tracks.append(t)
-
-        return playlist_name, unique_tracks
-
-    def extract_spotify_playlist_id(self, url):
-        """Extrai o ID da playlist de um link do Spotify."""
-        # https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M
-        # https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M?si=...
-        match = re.search(r'playlist/([a-zA-Z0-9]+)', url)
-        return match.group(1) if match else None
-
-    def load_csv_file(self, filepath):
-        try:
-            tracks = []
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    track_name = row.get('Track Name', '')
-                    artists = row.get('Artist Name(s)', '')
-                    if track_name:
-                        tracks.append({'name': track_name, 'artists': artists})
-
-            if tracks:
-                playlist_name = Path(filepath).stem
-                self.csv_files.append({
-                    'name': playlist_name,
-                    'filepath': filepath,
-                    'tracks': tracks,
-                    'tracks_total': len(tracks),
-                    'target': None,  # Será definido: 'new' ou {'merge': playlist_id}
-                    'target_name': None
-                })
-                self.log(f"Carregado: {playlist_name} ({len(tracks)} musicas)")
-            else:
-                self.log(f"Aviso: Nenhuma musica encontrada em {Path(filepath).name}")
-        except Exception as e:
-            self.log(f"Erro ao carregar {Path(filepath).name}: {e}")
+    def on_links_imported(self, imported, failures):
+        """Relatório final da importação de links."""
+        self.link_btn.configure(state="normal", text="Link Spotify")
+        self.log(f"Links importados: {imported}, com erro: {len(failures)}")
+        if failures:
+            report = "\n".join(f"- {link}\n  {error}" for link, error in failures[:10])
+            if len(failures) > 10:
+                report += f"\n... e mais {len(failures) - 10}"
+            messagebox.showerror(
+                "Erro",
+                f"{imported} playlist(s) importada(s), {len(failures)} com erro:\n\n{report}"
+            )
 
     def clear_list(self):
         self.csv_files = []
@@ -878,64 +787,67 @@ class SpotifyYTMusicApp(ctk.CTk):
         self.check_ready()
 
     def display_csv_playlists(self):
-        for widget in self.csv_scroll.winfo_children():
-            widget.destroy()
-
-        self.playlist_checkboxes = []
-        self.playlist_vars = []
-
-        if not self.csv_files:
-            self.csv_placeholder = ctk.CTkLabel(
-                self.csv_scroll,
-                text="Importe playlists usando o botao 'Link Spotify'\nou CSV do Exportify (exportify.app)",
-                font=ctk.CTkFont(size=14),
-                text_color="gray"
-            )
-            self.csv_placeholder.grid(row=0, column=0, pady=50)
+        self.csv_list.set_items(self.csv_files)
+        if self.csv_files:
+            self.spotify_status.configure(text=f"{len(self.csv_files)} playlist(s)")
+        else:
             self.spotify_status.configure(text="Nenhuma playlist")
-            return
 
-        for i, pl in enumerate(self.csv_files):
-            var = ctk.BooleanVar(value=True)
-            self.playlist_vars.append(var)
+    def create_csv_row(self, parent):
+        """Widgets de uma linha da lista de playlists (reaproveitados na rolagem)."""
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        frame = ctk.CTkFrame(row)
+        frame.pack(fill="both", expand=True, padx=5, pady=2)
+        frame.grid_columnconfigure(1, weight=1)
 
-            frame = ctk.CTkFrame(self.csv_scroll)
-            frame.grid(row=i, column=0, padx=5, pady=2, sticky="ew")
-            frame.grid_columnconfigure(1, weight=1)
+        row.cb = ctk.CTkCheckBox(frame, text="", width=24, command=lambda: self.on_csv_checked(row))
+        row.cb.grid(row=0, column=0, padx=(10, 5), pady=6)
 
-            cb = ctk.CTkCheckBox(frame, text="", variable=var, width=24)
-            cb.grid(row=0, column=0, padx=(10, 5), pady=8)
-            self.playlist_checkboxes.append(cb)
+        row.name_label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=14), anchor="w")
+        row.name_label.grid(row=0, column=1, padx=5, pady=6, sticky="w")
 
-            name_label = ctk.CTkLabel(frame, text=pl['name'], font=ctk.CTkFont(size=14), anchor="w")
-            name_label.grid(row=0, column=1, padx=5, pady=8, sticky="w")
+        row.info_label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=12), text_color="gray")
+        row.info_label.grid(row=0, column=2, padx=5, pady=6, sticky="e")
 
-            # Mostrar destino se definido
-            target_text = f"{pl['tracks_total']} musicas"
-            if pl.get('target') == 'merge' and pl.get('target_name'):
-                target_text = f"→ Merge: {pl['target_name']}"
-            elif pl.get('target') == 'new':
-                target_text = f"→ Nova playlist"
-
-            info_label = ctk.CTkLabel(frame, text=target_text, font=ctk.CTkFont(size=12), text_color="gray")
-            info_label.grid(row=0, column=2, padx=5, pady=8, sticky="e")
-
-            # Botão para escolher destino
-            dest_btn = ctk.CTkButton(
-                frame, text="Destino", width=70, height=28,
-                command=lambda idx=i: self.choose_destination(idx),
-                state="normal" if self.ytm else "disabled"
-            )
-            dest_btn.grid(row=0, column=3, padx=5, pady=8)
+        # Botão para escolher destino
+        row.dest_btn = ctk.CTkButton(
+            frame, text="Destino", width=70, height=28,
+            command=lambda: self.choose_destination(row.index)
+        )
+        row.dest_btn.grid(row=0, column=3, padx=5, pady=6)
 
-            remove_btn = ctk.CTkButton(
-                frame, text="X", width=30, height=28,
-                fg_color="gray40", hover_color="red",
-                command=lambda idx=i: self.remove_playlist(idx)
-            )
-            remove_btn.grid(row=0, column=4, padx=5, pady=8)
+        remove_btn = ctk.CTkButton(
+            frame, text="X", width=30, height=28,
+            fg_color="gray40", hover_color="red",
+            command=lambda: self.remove_playlist(row.index)
+        )
+        remove_btn.grid(row=0, column=4, padx=5, pady=6)
+        return row
 
-        self.spotify_status.configure(text=f"{len(self.csv_files)} playlist(s)")
+    def bind_csv_row(self, row, pl, index):
+        row.index = index
+        if pl.get('selected', True):
+            row.cb.select()
+        else:
+            row.cb.deselect()
+        row.cb.configure(state="disabled" if self.is_transferring else "normal")
+        row.name_label.configure(text=pl['name'])
+
+        # Mostrar destino se definido
+        target_text = f"{pl['tracks_total']} musicas"
+        if pl.get('progress'):
+            done, total = pl['progress']
+            target_text = "✓ Concluida" if done >= total else f"{done}/{total} musicas"
+        elif pl.get('target') == 'merge' and pl.get('target_name'):
+            target_text = f"→ Merge: {pl['target_name']}"
+        elif pl.get('target') == 'new':
+            target_text = f"→ Nova playlist"
+        row.info_label.configure(text=target_text)
+
+        row.dest_btn.configure(state="normal" if self.ytm else "disabled")
+
+    def on_csv_checked(self, row):
+        self.csv_files[row.index]['selected'] = bool(row.cb.get())
 
     def choose_destination(self, index):
         """Abre dialog para escolher destino da playlist."""
@@ -948,6 +860,8 @@ class SpotifyYTMusicApp(ctk.CTk):
         def on_choice(action, playlist_id, playlist_name):
             if action is None:
                 return
+            # Novo destino: o resultado da transferência anterior deixa de valer
+            self.csv_files[index]['progress'] = None
             if action == "new":
                 self.csv_files[index]['target'] = 'new'
                 self.csv_files[index]['target_name'] = None
@@ -957,7 +871,7 @@ class SpotifyYTMusicApp(ctk.CTk):
                 self.csv_files[index]['target_id'] = playlist_id
                 self.csv_files[index]['target_name'] = playlist_name
                 self.log(f"{csv_playlist['name']}: Merge com '{playlist_name}'")
-            self.display_csv_playlists()
+            self.csv_list.update_row(index)
 
         PlaylistSelectDialog(self, csv_playlist, self.yt_playlists, on_choice)
 
@@ -970,58 +884,101 @@ class SpotifyYTMusicApp(ctk.CTk):
 
     def toggle_select_all(self):
         select = self.select_all_var.get()
-        for var in self.playlist_vars:
-            var.set(select)
+        for pl in self.csv_files:
+            pl['selected'] = select
+        self.csv_list.refresh()
 
     def load_ytm_playlists(self):
         """Carrega playlists do YouTube Music."""
         if not self.ytm:
             return
 
-        self.refresh_ytm_btn.configure(state="disabled", text="Carregando...")
+        if self.ytm_loading:
+            return
+        self.ytm_loading = True
+        self.update_refresh_btn()
+        if not self.yt_playlists:
+            # Mostrar a última lista salva enquanto a atual é carregada
+            self.yt_playlists = self.engine.cached_library_playlists()
+            self.display_ytm_playlists()
         self.log("Carregando playlists do YouTube Music...")
 
         def do_load():
             try:
-                playlists = self.ytm.get_library_playlists(limit=50)
-                self.yt_playlists = playlists or []
-                self.after(0, self.display_ytm_playlists)
-                self.after(0, lambda: self.log(f"Encontradas {len(self.yt_playlists)} playlists no YouTube Music"))
+                playlists = []
+                for playlists in self.engine.iter_library_playlists():
+                    self.channel.post(self.show_ytm_playlists, playlists)
+                self.channel.post(self.log, f"Encontradas {len(playlists)} playlists no YouTube Music")
             except Exception as e:
-                self.after(0, lambda: self.log(f"Erro ao carregar playlists: {e}"))
+                self.channel.post(self.log, f"Erro ao carregar playlists: {e}")
             finally:
-                self.after(0, lambda: self.refresh_ytm_btn.configure(state="normal", text="Atualizar"))
+                self.channel.post(self.on_ytm_playlists_loaded)
 
         threading.Thread(target=do_load, daemon=True).start()
 
+    def on_ytm_playlists_loaded(self):
+        self.ytm_loading = False
+        self.update_refresh_btn()
+
+    def show_ytm_playlists(self, playlists):
+        self.yt_playlists = playlists
+        self.display_ytm_playlists()
+
+    def refresh_touched_playlists(self):
+        """Atualiza na lista só as playlists alteradas pela transferência."""
+        touched = list(self.engine.touched)
+        if not self.ytm or not touched:
+            return
+
+        def do_refresh():
+            try:
+                refreshed = self.engine.refresh_playlists(touched)
+                self.channel.post(self.merge_ytm_playlists, refreshed)
+            except Exception as e:
+                self.channel.post(self.log, f"Erro ao atualizar playlists: {e}")
+
+        threading.Thread(target=do_refresh, daemon=True).start()
+
+    def merge_ytm_playlists(self, refreshed):
+        by_id = {pl.playlist_id: pl for pl in refreshed}
+        playlists = [by_id.pop(pl.playlist_id, pl) for pl in self.yt_playlists]
+        # Playlists novas aparecem no topo, como na biblioteca
+        self.show_ytm_playlists(list(by_id.values()) + playlists)
+
     def display_ytm_playlists(self):
         """Exibe playlists do YouTube Music."""
-        for widget in self.ytm_scroll.winfo_children():
-            widget.destroy()
+        self.render_ytm_playlists()
 
-        if not self.yt_playlists:
-            ctk.CTkLabel(
-                self.ytm_scroll,
-                text="Nenhuma playlist encontrada",
-                font=ctk.CTkFont(size=14),
-                text_color="gray"
-            ).grid(row=0, column=0, pady=50)
+        # Atualizar botões de destino nos CSVs
+        self.csv_list.refresh()
+
+    def render_ytm_playlists(self):
+        """Preenche a aba do YouTube Music, se ela já foi montada."""
+        if not self.ytm_tab_ready:
             return
 
-        for i, pl in enumerate(self.yt_playlists):
-            frame = ctk.CTkFrame(self.ytm_scroll)
-            frame.grid(row=i, column=0, padx=5, pady=2, sticky="ew")
-            frame.grid_columnconfigure(0, weight=1)
+        if self.ytm:
+            self.ytm_list.set_empty_text("Nenhuma playlist encontrada")
+        else:
+            self.ytm_list.set_empty_text("Conecte-se ao YouTube Music para ver suas playlists")
+        self.ytm_list.set_items(self.yt_playlists)
 
-            name_label = ctk.CTkLabel(frame, text=pl.get('title', 'Sem nome'), font=ctk.CTkFont(size=14), anchor="w")
-            name_label.grid(row=0, column=0, padx=10, pady=8, sticky="w")
+    def create_ytm_row(self, parent):
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        frame = ctk.CTkFrame(row)
+        frame.pack(fill="both", expand=True, padx=5, pady=2)
+        frame.grid_columnconfigure(0, weight=1)
 
-            count = pl.get('count', '?')
-            info_label = ctk.CTkLabel(frame, text=f"{count} musicas", font=ctk.CTkFont(size=12), text_color="gray")
-            info_label.grid(row=0, column=1, padx=10, pady=8, sticky="e")
+        row.name_label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=14), anchor="w")
+        row.name_label.grid(row=0, column=0, padx=10, pady=6, sticky="w")
 
-        # Atualizar botões de destino nos CSVs
-        self.display_csv_playlists()
+        row.info_label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=12), text_color="gray")
+        row.info_label.grid(row=0, column=1, padx=10, pady=6, sticky="e")
+        return row
+
+    def bind_ytm_row(self, row, pl, index):
+        row.name_label.configure(text=pl.title)
+        row.info_label.configure(text=f"{pl.count_text} musicas")
 
     # === Autenticação ===
 
@@ -1070,13 +1027,13 @@ class SpotifyYTMusicApp(ctk.CTk):
         def do_oauth():
             try:
                 from ytmusicapi.setup import setup_oauth
-                self.after(0, lambda: self.log("Abrindo navegador para login..."))
+                self.channel.post(self.log, "Abrindo navegador para login...")
                 setup_oauth(client_id=client_id, client_secret=client_secret, filepath='oauth.json', open_browser=True)
-                self.ytm = YTMusic('oauth.json')
-                self.after(0, self.on_ytmusic_connected)
+                self.ytm = connect('oauth.json')
+                self.channel.post(self.on_ytmusic_connected)
             except Exception as e:
-                self.after(0, lambda: self.log(f"Erro OAuth: {e}"))
-                self.after(0, lambda: self.ytm_btn.configure(state="normal", text="Conectar YT Music"))
+                self.channel.post(self.log, f"Erro OAuth: {e}")
+                self.channel.post(lambda: self.ytm_btn.configure(state="normal", text="Conectar YT Music"))
 
         threading.Thread(target=do_oauth, daemon=True).start()
 
@@ -1096,11 +1053,11 @@ class SpotifyYTMusicApp(ctk.CTk):
                 with open('browser_headers.json', 'w') as f:
                     json.dump(headers, f, indent=2)
 
-                self.ytm = YTMusic('browser_headers.json')
-                self.after(0, self.on_ytmusic_connected)
+                self.ytm = connect('browser_headers.json')
+                self.channel.post(self.on_ytmusic_connected)
             except Exception as e:
-                self.after(0, lambda: self.log(f"Erro na autenticação: {e}"))
-                self.after(0, lambda: self.ytm_btn.configure(state="normal", text="Conectar YT Music"))
+                self.channel.post(self.log, f"Erro na autenticação: {e}")
+                self.channel.post(lambda: self.ytm_btn.configure(state="normal", text="Conectar YT Music"))
 
         threading.Thread(target=do_browser_auth, daemon=True).start()
 
@@ -1110,7 +1067,7 @@ class SpotifyYTMusicApp(ctk.CTk):
             cookie_match = re.search(r"-H 'Cookie: ([^']+)'", curl_text)
 
         if not cookie_match:
-            self.after(0, lambda: self.log("Erro: Cookie nao encontrado no cURL"))
+            self.channel.post(self.log, "Erro: Cookie nao encontrado no cURL")
             return None
 
         cookie = cookie_match.group(1).strip()
@@ -1140,7 +1097,7 @@ class SpotifyYTMusicApp(ctk.CTk):
         if authorization:
             headers["authorization"] = authorization
 
-        self.after(0, lambda: self.log(f"Headers extraidos: Cookie=OK, Auth={'OK' if authorization else 'FALTA'}"))
+        self.channel.post(self.log, f"Headers extraidos: Cookie=OK, Auth={'OK' if authorization else 'FALTA'}")
         return headers
 
     def connect_with_file(self, filepath):
@@ -1149,19 +1106,22 @@ class SpotifyYTMusicApp(ctk.CTk):
 
         def do_connect():
             try:
-                self.ytm = YTMusic(filepath)
-                self.after(0, self.on_ytmusic_connected)
+                self.ytm = connect(filepath)
+                self.channel.post(self.on_ytmusic_connected)
             except Exception as e:
-                self.after(0, lambda: self.log(f"Erro: {e}"))
-                self.after(0, lambda: self.ytm_btn.configure(state="normal", text="Conectar YT Music"))
+                self.channel.post(self.log, f"Erro: {e}")
+                self.channel.post(lambda: self.ytm_btn.configure(state="normal", text="Conectar YT Music"))
 
         threading.Thread(target=do_connect, daemon=True).start()
 
     def on_ytmusic_connected(self):
         self.ytm_status.configure(text="YouTube Music: Conectado")
         self.ytm_btn.configure(state="normal", text="Desconectar", command=self.disconnect_ytmusic)
-        self.refresh_ytm_btn.configure(state="normal")
+        self.update_refresh_btn()
         self.log("Conectado ao YouTube Music!")
+        indexed = self.engine.open_library()
+        if indexed:
+            self.log(f"Usando indice local da biblioteca ({indexed} musicas)")
         self.load_ytm_playlists()
         self.check_ready()
 
@@ -1171,7 +1131,7 @@ class SpotifyYTMusicApp(ctk.CTk):
         self.yt_playlists = []
         self.ytm_status.configure(text="YouTube Music: Desconectado")
         self.ytm_btn.configure(text="Conectar YT Music", command=self.show_auth_options)
-        self.refresh_ytm_btn.configure(state="disabled")
+        self.update_refresh_btn()
         self.display_ytm_playlists()
         self.display_csv_playlists()  # Atualizar botões de destino
         self.check_ready()
@@ -1184,7 +1144,7 @@ class SpotifyYTMusicApp(ctk.CTk):
             self.transfer_btn.configure(state="disabled")
 
     def get_selected_playlists(self):
-        return [self.csv_files[i] for i, var in enumerate(self.playlist_vars) if var.get()]
+        return [pl for pl in self.csv_files if pl.get('selected', True)]
 
     # === Transferência ===
 
@@ -1199,178 +1159,101 @@ class SpotifyYTMusicApp(ctk.CTk):
             messagebox.showerror("Erro", "Conecte-se ao YouTube Music primeiro.")
             return
 
+        # Transferências interrompidas podem ser retomadas pelo diário
+        resume = False
+        interrupted = self.engine.pending_journals(selected)
+        if interrupted:
+            resume = messagebox.askyesnocancel(
+                "Retomar",
+                f"{len(interrupted)} transferencia(s) interrompida(s) encontrada(s).\n"
+                "Deseja retomar de onde parou?\n\n(Nao = recomecar do zero)"
+            )
+            if resume is None:
+                return
+
+        self.begin_transfer_ui(selected)
+        threading.Thread(target=self.do_transfer, args=(selected, resume), daemon=True).start()
+
+    def start_stream_transfer(self, playlist_id):
+        """Lê a playlist do Spotify e transfere direto (nova playlist)."""
+        # A playlist não entra na lista: só acompanha o progresso geral
+        self.begin_transfer_ui([make_playlist("Spotify Playlist", [], source='spotify')])
+        threading.Thread(target=self.do_stream_transfer, args=(playlist_id,), daemon=True).start()
+
+    def begin_transfer_ui(self, playlists):
+        # Progresso individual de cada playlist, mostrado na própria linha
+        for pl in playlists:
+            pl['progress'] = None
+        self.transfer_playlists = playlists
+
         self.is_transferring = True
-        self.cancel_transfer = False
-        self.transfer_btn.configure(text="Cancelar", command=self.cancel_transfer_operation, fg_color="red", hover_color="darkred")
+        self.transfer_btn.configure(state="normal", text="Cancelar", command=self.cancel_transfer_operation, fg_color="red", hover_color="darkred")
         self.csv_btn.configure(state="disabled")
+        self.folder_btn.configure(state="disabled")
         self.link_btn.configure(state="disabled")
 
-        for cb in self.playlist_checkboxes:
-            cb.configure(state="disabled")
-
-        threading.Thread(target=self.do_transfer, args=(selected,), daemon=True).start()
+        self.csv_list.refresh()  # desabilita as caixas de seleção
 
     def cancel_transfer_operation(self):
         """Cancela a operação de transferência em andamento."""
-        self.cancel_transfer = True
+        self.engine.cancel()
         self.transfer_btn.configure(state="disabled", text="Cancelando...")
         self.log("Cancelando transferencia...")
 
-    def do_transfer(self, playlists):
-        total_playlists = len(playlists)
-        was_cancelled = False
-
-        for pl_idx, playlist in enumerate(playlists):
-            # Verificar cancelamento
-            if self.cancel_transfer:
-                was_cancelled = True
-                break
-
-            self.after(0, lambda p=playlist: self.log(f"\n{'='*40}"))
-            self.after(0, lambda p=playlist: self.log(f"Transferindo: {p['name']}"))
-
-            tracks = playlist['tracks']
-
-            if not tracks:
-                self.after(0, lambda: self.log("Playlist vazia, pulando..."))
-                continue
-
-            # Verificar se é merge ou nova playlist
-            is_merge = playlist.get('target') == 'merge'
-            yt_playlist_id = playlist.get('target_id') if is_merge else None
-            existing_tracks = set()
-
-            if is_merge and yt_playlist_id:
-                self.after(0, lambda n=playlist.get('target_name'): self.log(f"Modo: MERGE com '{n}'"))
-                self.after(0, lambda: self.progress_label.configure(text="Carregando musicas existentes..."))
-
-                # Carregar músicas existentes da playlist
-                try:
-                    yt_playlist = self.ytm.get_playlist(yt_playlist_id, limit=None)
-                    if yt_playlist and 'tracks' in yt_playlist:
-                        for track in yt_playlist['tracks']:
-                            if track and track.get('title'):
-                                # Normalizar para comparação
-                                title = track['title'].lower().strip()
-                                artists = ""
-                                if track.get('artists'):
-                                    artists = ", ".join([a['name'] for a in track['artists']]).lower().strip()
-                                existing_tracks.add(f"{title}|{artists}")
-
-                    self.after(0, lambda n=len(existing_tracks): self.log(f"Musicas existentes na playlist: {n}"))
-                except Exception as e:
-                    self.after(0, lambda e=e: self.log(f"Erro ao carregar playlist existente: {e}"))
-            else:
-                # Criar nova playlist
-                self.after(0, lambda: self.log("Modo: NOVA PLAYLIST"))
-                self.after(0, lambda: self.progress_label.configure(text="Criando playlist no YouTube Music..."))
-
-                try:
-                    yt_playlist_id = self.ytm.create_playlist(
-                        playlist['name'],
-                        f"Importada do Spotify - {len(tracks)} musicas"
-                    )
-                    self.after(0, lambda: self.log("Playlist criada no YouTube Music"))
-                except Exception as e:
-                    self.after(0, lambda e=e: self.log(f"Erro ao criar playlist: {e}"))
-                    continue
-
-            # Buscar e adicionar músicas
-            found_videos = []
-            not_found = []
-            skipped = []
-            total_tracks = len(tracks)
-
-            for i, track in enumerate(tracks):
-                # Verificar cancelamento
-                if self.cancel_transfer:
-                    was_cancelled = True
-                    self.after(0, lambda f=len(found_videos): self.log(f"Cancelado. {f} musicas foram adicionadas antes do cancelamento."))
-                    # Adicionar as músicas encontradas até agora
-                    if found_videos:
-                        try:
-                            self.ytm.add_playlist_items(yt_playlist_id, found_videos)
-                        except:
-                            pass
-                    break
-
-                progress = (i + 1) / total_tracks
-                self.after(0, lambda p=progress: self.progress_bar.set(p))
-                self.after(0, lambda idx=i, total=total_tracks, plidx=pl_idx, pltotal=total_playlists:
-                    self.progress_label.configure(text=f"Playlist {plidx + 1}/{pltotal} - Musica {idx + 1}/{total}")
-                )
-                self.after(0, lambda t=track: self.current_track_label.configure(text=f"{t['name']} - {t['artists']}"))
-
-                # Verificar se já existe (para merge)
-                if is_merge:
-                    track_key = f"{track['name'].lower().strip()}|{track['artists'].lower().strip()}"
-                    # Verificação mais flexível
-                    already_exists = False
-                    for existing in existing_tracks:
-                        existing_title = existing.split('|')[0]
-                        if track['name'].lower().strip() in existing_title or existing_title in track['name'].lower().strip():
-                            already_exists = True
-                            break
-
-                    if already_exists:
-                        skipped.append(f"{track['name']} - {track['artists']}")
-                        continue
-
-                video_id = self.search_song(track)
-
-                if video_id:
-                    found_videos.append(video_id)
-                else:
-                    not_found.append(f"{track['name']} - {track['artists']}")
-
-                time.sleep(0.3)
-
-            # Se foi cancelado, sair do loop de playlists
-            if was_cancelled:
-                break
-
-            # Adicionar músicas à playlist
-            if found_videos:
-                self.after(0, lambda: self.current_track_label.configure(text="Adicionando musicas a playlist..."))
-
-                try:
-                    batch_size = 25
-                    for i in range(0, len(found_videos), batch_size):
-                        if self.cancel_transfer:
-                            break
-                        batch = found_videos[i:i + batch_size]
-                        self.ytm.add_playlist_items(yt_playlist_id, batch)
-                        time.sleep(1)
-                except Exception as e:
-                    self.after(0, lambda e=e: self.log(f"Erro ao adicionar musicas: {e}"))
-
-            # Resumo
-            summary = f"Adicionadas: {len(found_videos)}"
-            if skipped:
-                summary += f", Ja existiam: {len(skipped)}"
-            if not_found:
-                summary += f", Nao encontradas: {len(not_found)}"
-
-            self.after(0, lambda s=summary: self.log(s))
-
-            if not_found and len(not_found) <= 5:
-                self.after(0, lambda n=not_found: self.log(f"  Nao encontradas: {', '.join(n)}"))
-
-        self.after(0, lambda c=was_cancelled: self.on_transfer_complete(c))
-
-    def search_song(self, track):
-        query = f"{track['name']} {track['artists']}"
-        try:
-            results = self.ytm.search(query, filter='songs', limit=1)
-            if results:
-                return results[0].get('videoId')
-        except Exception:
-            pass
-        return None
+    def do_transfer(self, playlists, resume=False):
+        was_cancelled = self.engine.transfer(playlists, resume)
+        self.channel.post(self.on_transfer_complete, was_cancelled)
+
+    def do_stream_transfer(self, playlist_id):
+        was_cancelled = self.engine.fetch_and_transfer(playlist_id)
+        self.channel.post(self.on_transfer_complete, was_cancelled)
+
+    def on_engine_event(self, kind, **data):
+        """Recebe eventos do motor (thread de trabalho) e publica no canal."""
+        if kind == 'log':
+            self.channel.post(self.log, data['message'])
+        elif kind == 'status':
+            self.channel.set('status', data['message'])
+        elif kind == 'current':
+            self.channel.set('current', data['message'])
+        elif kind == 'progress':
+            # Uma chave por playlist: cada uma guarda só o último valor
+            self.channel.set(('playlist', data['playlist_index']), (data['done'], data['total']))
+            if data['track']:
+                self.channel.set('current', f"{data['name']}: {data['track']}")
+
+    def drain_channel(self):
+        """Aplica o que as threads publicaram desde o último tick."""
+        self.after(UI_TICK_MS, self.drain_channel)
+        state, actions = self.channel.drain()
+        progress = {key[1]: value for key, value in state.items()
+                    if isinstance(key, tuple) and key[0] == 'playlist'}
+        if progress:
+            self.update_transfer_progress(progress)
+        elif 'status' in state:
+            self.progress_label.configure(text=state['status'])
+        if 'current' in state:
+            self.current_track_label.configure(text=state['current'])
+        for fn, args in actions:
+            fn(*args)
+
+    def update_transfer_progress(self, progress):
+        """Atualiza as linhas das playlists e o progresso geral."""
+        for index, value in progress.items():
+            self.transfer_playlists[index]['progress'] = value
+
+        playlists = self.transfer_playlists
+        done = sum(pl['progress'][0] for pl in playlists if pl.get('progress'))
+        # Numa transferência em fluxo o total cresce conforme as músicas chegam
+        total = sum(pl['progress'][1] if pl.get('progress') else pl['tracks_total'] for pl in playlists) or 1
+        finished = sum(1 for pl in playlists if pl.get('progress') and pl['progress'][0] >= pl['progress'][1])
+
+        self.progress_bar.set(done / total)
+        self.progress_label.configure(text=f"Playlists concluidas: {finished}/{len(playlists)} - Musicas {done}/{total}")
+        self.csv_list.refresh()
 
     def on_transfer_complete(self, was_cancelled=False):
         self.is_transferring = False
-        self.cancel_transfer = False
         self.transfer_btn.configure(
             state="normal",
             text="Transferir Playlists Selecionadas",
@@ -1378,13 +1261,14 @@ class SpotifyYTMusicApp(ctk.CTk):
             fg_color=("#3B8ED0", "#1F6AA5"),
             hover_color=("#36719F", "#144870")
         )
+        self.check_ready()
         self.csv_btn.configure(state="normal")
+        self.folder_btn.configure(state="normal")
         self.link_btn.configure(state="normal")
         self.progress_bar.set(0)
         self.current_track_label.configure(text="")
 
-        for cb in self.playlist_checkboxes:
-            cb.configure(state="normal")
+        self.csv_list.refresh()
 
         self.log("\n" + "="*40)
 
@@ -1397,12 +1281,30 @@ class SpotifyYTMusicApp(ctk.CTk):
             self.log("Transferencia concluida!")
             messagebox.showinfo("Concluido", "Transferencia de playlists concluida!\nVerifique o log para detalhes.")
 
-        # Recarregar playlists do YT Music
-        self.load_ytm_playlists()
+        # Atualizar só as playlists do YT Music alteradas
+        self.refresh_touched_playlists()
+
+
+def report_startup(app, constructed):
+    """Imprime os tempos de inicialização em JSON e fecha (benchmarks/bench_startup.py)."""
+    if getattr(app, '_startup_reported', False):
+        return
+    app._startup_reported = True
+    app.update_idletasks()
+    painted = time.perf_counter()
+    print(json.dumps({
+        'imports_ms': (_IMPORTED - _STARTED) * 1000,
+        'construct_ms': (constructed - _IMPORTED) * 1000,
+        'first_paint_ms': (painted - _STARTED) * 1000,
+    }), flush=True)
+    app.after(0, app.destroy)
 
 
 def main():
     app = SpotifyYTMusicApp()
+    if os.environ.get('STARTUP_BENCHMARK'):
+        constructed = time.perf_counter()
+        app.bind('<Map>', lambda e: report_startup(app, constructed), add='+')
     app.mainloop()
 
 
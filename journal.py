@@ -0,0 +1,120 @@
+"""
+Diário (journal) de transferências.
+
+Cada transferência grava um arquivo JSON Lines só de acréscimo em
+`journals/`, com a playlist criada, o videoId resolvido de cada música e
+os lotes já gravados. Se o programa fechar ou a rede cair no meio, a
+transferência pode ser retomada sem refazer as buscas.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+JOURNAL_DIR = Path('journals')
+
+
+def transfer_id(playlist):
+    """Identificador estável de uma transferência (origem + destino + músicas)."""
+    h = hashlib.sha1()
+    h.update(json.dumps([
+        playlist['name'],
+        playlist.get('target') or 'new',
+        playlist.get('target_id'),
+    ]).encode('utf-8'))
+    for t in playlist['tracks']:
+        h.update(t.key.encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()[:16]
+
+
+class TransferJournal:
+    """Estado persistente de uma transferência."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.playlist_id = None
+        self.resolved = {}       # índice da música -> videoId (None = não encontrada)
+        self.committed = set()   # índices já gravados na playlist
+        self._file = None
+        self._truncated = False
+        self._lock = threading.Lock()  # o PlaylistWriter grava de outra thread
+        self._load()
+
+    @classmethod
+    def for_playlist(cls, playlist):
+        return cls(JOURNAL_DIR / f"{transfer_id(playlist)}.jsonl")
+
+    @property
+    def pending(self):
+        """True se existe uma transferência interrompida para retomar."""
+        return self.playlist_id is not None
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self._truncated = not line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última linha truncada por um fechamento abrupto
+                    continue
+                kind = record.get('type')
+                if kind == 'playlist':
+                    self.playlist_id = record['playlist_id']
+                elif kind == 'resolved':
+                    self.resolved[record['index']] = record['video_id']
+                elif kind == 'committed':
+                    self.committed.update(record['indexes'])
+
+    def _append(self, record, sync=False):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+                if self._truncated:
+                    # Isolar a linha incompleta deixada por um fechamento abrupto
+                    self._file.write("\n")
+            self._file.write(line)
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def start(self, playlist, playlist_id):
+        self.playlist_id = playlist_id
+        self._append({
+            'type': 'playlist',
+            'name': playlist['name'],
+            'target': playlist.get('target') or 'new',
+            'playlist_id': playlist_id,
+        }, sync=True)
+
+    def record_resolved(self, index, video_id):
+        self.resolved[index] = video_id
+        self._append({'type': 'resolved', 'index': index, 'video_id': video_id})
+
+    def record_committed(self, indexes):
+        self.committed.update(indexes)
+        self._append({'type': 'committed', 'indexes': list(indexes)}, sync=True)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """Apaga o diário (transferência concluída ou recomeçada do zero)."""
+        self.close()
+        self.playlist_id = None
+        self.resolved = {}
+        self.committed = set()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
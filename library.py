@@ -0,0 +1,145 @@
+"""
+Índice local da biblioteca do YouTube Music.
+
+Opcional: construído sob demanda a partir das músicas da biblioteca e do
+conteúdo das playlists do usuário. Antes de buscar uma música na rede, o
+motor procura aqui: primeiro pela chave normalizada 'nome|artistas' e,
+se não achar, por texto (FTS5, quando o SQLite tiver suporte), aceitando
+só candidatos com algum artista igual (nome inteiro, não trecho) e o mesmo
+título. Sem título exato, vale só o título seguido de um sufixo que não
+muda a gravação: remasterização ou participação ("Nome (Remastered 2011)",
+"Nome - 2009 Remaster", "Nome (feat. X)"). Versões ao vivo, remixes e
+acústicas ficam para a busca na rede.
+"""
+
+import re
+import sqlite3
+import threading
+
+from cache import CACHE_DIR, _connect
+from normalize import normalize, track_key
+
+CANDIDATES = 10  # candidatos verificados por busca de texto
+# Sufixos (títulos normalizados) que mantêm a mesma gravação
+SAME_RECORDING_SUFFIX = re.compile(
+    r'(?: \(| \[| - )(?:(?:\d{4} )?(?:digital )?remaster(?:ed)?\b|(?:feat\.?|ft\.|with) )'
+)
+
+
+def _artist_names(item):
+    return ", ".join(a['name'] for a in item.get('artists') or [] if a and a.get('name'))
+
+
+def _fts_query(text):
+    """Termos entre aspas (o FTS5 não interpreta a pontuação das músicas)."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class LibraryIndex:
+    """Músicas que o usuário já tem no YouTube Music: chave -> videoId."""
+
+    def __init__(self, path=CACHE_DIR / 'library.sqlite3'):
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS songs ("
+                " key TEXT PRIMARY KEY,"
+                " title TEXT NOT NULL,"
+                " artists TEXT NOT NULL,"
+                " video_id TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS songs_title ON songs(title)")
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5("
+                    " title, artists, content='songs', content_rowid='rowid')"
+                )
+                self.fts = True
+            except sqlite3.Error:
+                self.fts = False
+        self.hits = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+    def build(self, ytm, call=None, log=None):
+        """Reconstrói o índice com a biblioteca e as playlists do usuário.
+
+        `call(fn, *args, **kwargs)` permite passar as requisições pelo
+        limitador do motor. Retorna o número de músicas indexadas.
+        """
+        call = call or (lambda fn, *args, **kwargs: fn(*args, **kwargs))
+        log = log or (lambda message: None)
+        rows = {}
+
+        def add(items):
+            for item in items or []:
+                if item and item.get('videoId') and item.get('title'):
+                    artists = _artist_names(item)
+                    key = track_key(item['title'], artists)
+                    rows.setdefault(key, (key, normalize(item['title']), normalize(artists), item['videoId']))
+
+        log("Indexando musicas da biblioteca...")
+        add(call(ytm.get_library_songs, limit=None))
+        playlists = call(ytm.get_library_playlists, limit=None) or []
+        for i, playlist in enumerate(playlists, 1):
+            log(f"Indexando playlist {i}/{len(playlists)}: {playlist.get('title', '')}")
+            try:
+                add((call(ytm.get_playlist, playlist['playlistId'], limit=None) or {}).get('tracks'))
+            except Exception as e:
+                log(f"Erro ao indexar '{playlist.get('title', '')}': {e}")
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM songs")
+            self._conn.executemany(
+                "INSERT INTO songs (key, title, artists, video_id) VALUES (?, ?, ?, ?)", rows.values()
+            )
+            if self.fts:
+                self._conn.execute("INSERT INTO songs_fts(songs_fts) VALUES ('rebuild')")
+        return len(rows)
+
+    def lookup(self, track):
+        """videoId da música se ela já estiver na biblioteca; senão None."""
+        with self._lock:
+            row = self._conn.execute("SELECT video_id FROM songs WHERE key = ?", (track.key,)).fetchone()
+            if row is None:
+                row = self._match_text(track)
+            if row is None:
+                return None
+            self.hits += 1
+        return row[0]
+
+    def _match_text(self, track):
+        # Mesmo título com artistas em outra ordem/formato ("A, B" x "A & B")
+        title = normalize(track.name)
+        artists = {normalize(a) for a in track.artists.split(",") if a.strip()}
+        if not title or not artists:
+            return None
+        if self.fts:
+            rows = self._conn.execute(
+                "SELECT s.video_id, s.title, s.artists FROM songs_fts f JOIN songs s ON s.rowid = f.rowid"
+                " WHERE songs_fts MATCH ? ORDER BY f.rank LIMIT ?",
+                (f"title : ({_fts_query(title)})", CANDIDATES)
+            ).fetchall()
+        else:
+            rows = self._conn.execute(
+                "SELECT video_id, title, artists FROM songs WHERE title >= ? AND title < ? LIMIT ?",
+                (title, title + "\uffff", CANDIDATES)
+            ).fetchall()
+        # Título exato tem prioridade; remaster/feat. só sem título exato
+        version = None
+        for video_id, candidate_title, candidate_artists in rows:
+            if artists.isdisjoint(a.strip() for a in candidate_artists.split(", ")):
+                continue
+            if candidate_title == title:
+                return (video_id,)
+            if version is None and candidate_title.startswith(title) \
+                    and SAME_RECORDING_SUFFIX.match(candidate_title, len(title)):
+                version = (video_id,)
+        return version
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
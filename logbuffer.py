@@ -0,0 +1,87 @@
+"""
+Log da aplicação: buffer circular para a interface e arquivo rotativo em disco.
+
+A interface mostra só as últimas LOG_LINES linhas, atualizadas em lotes.
+Todas as linhas vão também para `logs/transfer.log` (com data/hora e
+nível), gravado por uma thread em segundo plano (QueueHandler/QueueListener)
+para que o disco nunca atrase a interface ou a transferência.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+
+LOG_DIR = Path('logs')
+LOG_LINES = 500            # linhas mantidas na caixa de log
+LOG_REFRESH_MS = 200       # intervalo de atualização da caixa de log
+LOG_MAX_BYTES = 2 * 1024 * 1024
+LOG_BACKUPS = 5
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _level_for(message):
+    """Nível a partir do texto (as mensagens seguem o padrão 'Erro...'/'Aviso...')."""
+    text = message.lstrip().lower()
+    if text.startswith('erro') or 'falhou' in text:
+        return logging.ERROR
+    if text.startswith('aviso') or text.startswith('cancel'):
+        return logging.WARNING
+    return logging.INFO
+
+
+def get_file_logger(path=None):
+    """Logger que grava no arquivo rotativo por uma thread em segundo plano."""
+    global _logger
+    with _logger_lock:
+        if _logger is not None:
+            return _logger
+
+        logger = logging.getLogger('spotify_to_ytmusic')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        try:
+            path = Path(path or LOG_DIR / 'transfer.log')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8'
+            )
+        except OSError:
+            # Sem permissão de escrita: segue só com o log da interface
+            logger.addHandler(logging.NullHandler())
+        else:
+            file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s %(message)s'))
+            log_queue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(log_queue, file_handler)
+            listener.start()
+            atexit.register(listener.stop)
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _logger = logger
+        return logger
+
+
+def log_to_file(message):
+    get_file_logger().log(_level_for(message), message.strip('\n'))
+
+
+class LogBuffer:
+    """Buffer circular das últimas linhas, com as ainda não exibidas à parte."""
+
+    def __init__(self, maxlen=LOG_LINES):
+        self.lines = deque(maxlen=maxlen)
+        self._pending = deque(maxlen=maxlen)
+
+    def append(self, message):
+        self.lines.append(message)
+        self._pending.append(message)
+
+    def take_pending(self):
+        """Linhas adicionadas desde a última chamada (no máximo maxlen)."""
+        pending = list(self._pending)
+        self._pending.clear()
+        return pending
@@ -0,0 +1,176 @@
+"""
+Métricas de desempenho de uma execução da transferência.
+
+Cada fase (leitura do Spotify, carga da playlist de destino, criação da
+playlist, buscas e gravação dos lotes) tem um histograma de latências, e
+contadores registram músicas, acertos de cache e novas tentativas. No fim
+da execução o relatório vai para `reports/`: um JSON por execução e o
+arquivo `transfer.prom` no formato texto do Prometheus (sobrescrito a cada
+execução, para o textfile collector do node_exporter).
+"""
+
+import json
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+REPORT_DIR = Path('reports')
+PREFIX = 'spotify_to_ytmusic'
+# Limites (segundos) dos buckets dos histogramas
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def percentile(values, q):
+    """Percentil por posição mais próxima (values ordenado)."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+class Histogram:
+    """Latências de uma fase: buckets cumulativos e as amostras para percentis."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.samples = []
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+        self.sum += seconds
+        i = bisect_left(self.buckets, seconds)
+        if i < len(self.counts):
+            self.counts[i] += 1
+
+    def summary(self):
+        values = sorted(self.samples)
+        count = len(values)
+        return {
+            'count': count,
+            'sum': self.sum,
+            'mean': self.sum / count if count else 0.0,
+            'p50': percentile(values, 0.50),
+            'p95': percentile(values, 0.95),
+            'p99': percentile(values, 0.99),
+            'max': values[-1] if values else 0.0,
+        }
+
+
+class Metrics:
+    """Histogramas por fase e contadores de uma execução (thread-safe)."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    @contextmanager
+    def timer(self, phase):
+        """Mede o bloco como uma observação da fase (também quando falha)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def timed(self, phase, fn):
+        """fn envolvida para medir só a chamada (cada tentativa é uma observação).
+
+        Usada dentro do limitador: a espera por vez e o backoff entre
+        tentativas ficam fora da latência da fase.
+        """
+        def call(*args, **kwargs):
+            with self.timer(phase):
+                return fn(*args, **kwargs)
+        return call
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def value(self, name):
+        """Valor atual de um contador (0 se nunca contado)."""
+        with self._lock:
+            return self.counters.get(name, 0)
+
+    def report(self, gauges=None):
+        """Relatório da execução até agora (dict serializável em JSON)."""
+        duration = time.perf_counter() - self._started
+        with self._lock:
+            phases = {phase: h.summary() for phase, h in sorted(self.histograms.items())}
+            counters = dict(sorted(self.counters.items()))
+        lookups = counters.get('search_cache_hits', 0) + counters.get('search_cache_misses', 0)
+        snapshots = counters.get('snapshot_hits', 0) + counters.get('snapshot_misses', 0)
+        return {
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'duration_seconds': duration,
+            'tracks_per_second': counters.get('tracks', 0) / duration if duration else 0.0,
+            'search_cache_hit_rate': counters.get('search_cache_hits', 0) / lookups if lookups else 0.0,
+            'snapshot_hit_rate': counters.get('snapshot_hits', 0) / snapshots if snapshots else 0.0,
+            'phases': phases,
+            'counters': counters,
+            'gauges': dict(gauges or {}),
+        }
+
+    def write(self, report, directory=REPORT_DIR):
+        """Grava o JSON da execução e o arquivo do Prometheus; retorna o caminho do JSON."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.fromtimestamp(self.started_at).strftime('%Y%m%d-%H%M%S')
+        path = directory / f'transfer-{stamp}.json'
+        path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        with self._lock:
+            histograms = {phase: (list(h.counts), h.sum, len(h.samples)) for phase, h in self.histograms.items()}
+        prom = directory / 'transfer.prom'
+        # Grava ao lado e renomeia: o coletor nunca lê um arquivo pela metade
+        tmp = prom.with_suffix('.prom.tmp')
+        tmp.write_text(prometheus_text(report, histograms), encoding='utf-8')
+        tmp.replace(prom)
+        return path
+
+
+def prometheus_text(report, histograms, buckets=BUCKETS):
+    """Relatório no formato texto de exposição do Prometheus."""
+    lines = [
+        f"# HELP {PREFIX}_phase_seconds Latencia de cada fase da transferencia.",
+        f"# TYPE {PREFIX}_phase_seconds histogram",
+    ]
+    for phase, (counts, total, count) in sorted(histograms.items()):
+        cumulative = 0
+        for le, n in zip(buckets, counts):
+            cumulative += n
+            lines.append(f'{PREFIX}_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+        lines.append(f'{PREFIX}_phase_seconds_bucket{{phase="{phase}",le="+Inf"}} {count}')
+        lines.append(f'{PREFIX}_phase_seconds_sum{{phase="{phase}"}} {total}')
+        lines.append(f'{PREFIX}_phase_seconds_count{{phase="{phase}"}} {count}')
+
+    for name, value in report['counters'].items():
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        lines.append(f"{PREFIX}_{name}_total {value}")
+
+    gauges = {
+        'run_duration_seconds': report['duration_seconds'],
+        'tracks_per_second': report['tracks_per_second'],
+        'search_cache_hit_ratio': report['search_cache_hit_rate'],
+        'snapshot_hit_ratio': report['snapshot_hit_rate'],
+        'run_timestamp_seconds': datetime.fromisoformat(report['started_at']).timestamp(),
+    }
+    gauges.update(report['gauges'])
+    for name, value in gauges.items():
+        lines.append(f"# TYPE {PREFIX}_{name} gauge")
+        lines.append(f"{PREFIX}_{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,50 @@
+"""
+Registros compactos de músicas e playlists.
+
+Uma biblioteca grande tem centenas de milhares de músicas: em vez de um
+dict por música, cada uma é um objeto com __slots__, com a string de
+artistas internada (o mesmo artista é repetido milhares de vezes) e a
+chave normalizada calculada uma única vez. Das respostas do YouTube Music
+guardamos só os campos usados.
+"""
+
+import sys
+
+from normalize import track_key
+
+
+class Track:
+    """Música importada do Spotify: nome, artistas e chave normalizada."""
+
+    __slots__ = ('name', 'artists', 'key')
+
+    def __init__(self, name, artists=''):
+        self.name = name
+        self.artists = sys.intern(artists or '')
+        self.key = track_key(name, self.artists)
+
+    def __repr__(self):
+        return f"Track({self.name!r}, {self.artists!r})"
+
+    def __str__(self):
+        return f"{self.name} - {self.artists}"
+
+
+class YTPlaylist:
+    """Playlist da biblioteca do YouTube Music (só os campos exibidos)."""
+
+    __slots__ = ('playlist_id', 'title', 'count')
+
+    def __init__(self, playlist_id, title, count=None):
+        self.playlist_id = playlist_id
+        self.title = title
+        self.count = count
+
+    @classmethod
+    def from_api(cls, data):
+        """Projeta um item de `get_library_playlists`."""
+        return cls(data.get('playlistId'), data.get('title') or 'Sem nome', data.get('count'))
+
+    @property
+    def count_text(self):
+        return '?' if self.count is None else str(self.count)
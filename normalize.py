@@ -0,0 +1,15 @@
+"""
+Normalização de textos para comparar músicas entre Spotify e YouTube Music.
+"""
+
+import unicodedata
+
+
+def normalize(text):
+    """Minúsculas, forma Unicode canônica e espaços colapsados."""
+    return " ".join(unicodedata.normalize('NFKC', text or '').casefold().split())
+
+
+def track_key(name, artists):
+    """Chave 'nome|artistas' normalizada de uma música."""
+    return f"{normalize(name)}|{normalize(artists)}"
@@ -0,0 +1,103 @@
+"""
+Estágio de escrita da transferência.
+
+As buscas (produtor) entregam os videoIds encontrados a um PlaylistWriter
+(consumidor), que os adiciona à playlist em lotes enquanto a busca
+continua. Assim uma falha no meio perde no máximo um lote.
+Um lote recusado pelo YouTube Music (resposta sem STATUS_SUCCEEDED)
+conta como falha e não é registrado no diário.
+
+`playlist_id` pode ser uma função: a playlist só é criada quando o
+primeiro lote estiver pronto (usado quando as músicas ainda estão
+chegando do Spotify e o nome final pode mudar).
+"""
+
+import queue
+import threading
+import time
+
+BATCH_SIZE = 25
+MAX_DELAY = 5.0      # segundos máximos que um lote incompleto espera
+
+_CLOSE = object()
+
+
+class BatchRejected(Exception):
+    """O YouTube Music recusou o lote sem levantar exceção (ex.: vídeo repetido)."""
+
+
+def batch_succeeded(result):
+    """True se a resposta de add_playlist_items indica que o lote foi gravado."""
+    # Em caso de recusa o ytmusicapi devolve a resposta bruta, sem STATUS_SUCCEEDED
+    return isinstance(result, dict) and 'SUCCEEDED' in str(result.get('status', ''))
+
+
+class PlaylistWriter:
+    """Thread consumidora que grava videoIds na playlist em lotes."""
+
+    def __init__(self, add_items, playlist_id, batch_size=BATCH_SIZE, max_delay=MAX_DELAY,
+                 on_commit=None, on_error=None):
+        self.add_items = add_items
+        self.playlist_id = playlist_id
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.on_commit = on_commit
+        self.on_error = on_error
+        self.added = 0
+        self.failed = 0
+        self._queue = queue.Queue()
+        self._abort = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, video_id, index=None):
+        """Enfileira um videoId; `index` identifica a música em on_commit."""
+        self._queue.put((index, video_id))
+
+    def close(self, flush=True):
+        """Encerra o consumidor; com flush=False descarta o que não foi gravado."""
+        if not flush:
+            self._abort = True
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _CLOSE:
+                if batch and not self._abort:
+                    self._flush(batch)
+                return
+
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.max_delay
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _flush(self, batch):
+        try:
+            if callable(self.playlist_id):
+                self.playlist_id = self.playlist_id()
+            result = self.add_items(self.playlist_id, [video_id for _, video_id in batch])
+            if not batch_succeeded(result):
+                status = result.get('status') if isinstance(result, dict) else None
+                raise BatchRejected(f"lote de {len(batch)} musicas recusado pelo YouTube Music ({status or 'sem status'})")
+            self.added += len(batch)
+            if self.on_commit:
+                self.on_commit([index for index, _ in batch])
+        except Exception as e:
+            self.failed += len(batch)
+            if self.on_error:
+                self.on_error(e)
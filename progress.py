@@ -0,0 +1,39 @@
+"""
+Canal de progresso entre as threads de trabalho e a interface.
+
+As threads publicam no canal; a interface esvazia o canal em intervalos
+fixos (UI_TICK_MS). Estados (barra, rótulos) guardam só o último valor
+publicado, então milhares de atualizações por segundo viram uma por tick.
+Ações pontuais (log, fim de carregamento etc.) são entregues todas, em ordem.
+"""
+
+import threading
+from collections import deque
+
+UI_TICK_MS = 60  # ~16 atualizações por segundo
+
+
+class ProgressChannel:
+    """Canal thread-safe com estado de último valor e fila de ações."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}
+        self._actions = deque()
+
+    def set(self, key, value):
+        """Publica um estado; só o valor mais recente de cada chave é entregue."""
+        with self._lock:
+            self._state[key] = value
+
+    def post(self, fn, *args):
+        """Agenda fn(*args) para rodar na thread da interface."""
+        with self._lock:
+            self._actions.append((fn, args))
+
+    def drain(self):
+        """Retorna (estados, ações) pendentes e esvazia o canal."""
+        with self._lock:
+            state, self._state = self._state, {}
+            actions, self._actions = self._actions, deque()
+        return state, actions
@@ -0,0 +1,192 @@
+"""
+Controle de taxa de requisições compartilhado entre threads.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+_HTTP_STATUS = re.compile(r'HTTP (\d{3})')
+_responses = threading.local()  # Retry-After da última resposta de cada thread
+
+
+class TokenBucket:
+    """Token bucket thread-safe: limita o total de requisições por segundo."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _wait_time(self, now):
+        """Segundos até o próximo token (0 = consumiu um token). Chamar com o lock."""
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def try_acquire(self):
+        """Consome um token se houver um disponível agora; não bloqueia."""
+        with self._lock:
+            return not self._wait_time(time.monotonic())
+
+    def acquire(self):
+        """Bloqueia até haver um token disponível e o consome."""
+        while True:
+            with self._lock:
+                wait = self._wait_time(time.monotonic())
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+def http_status(exc):
+    """Status HTTP de uma exceção (requests ou ytmusicapi), se houver."""
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        # ytmusicapi: "Server returned HTTP 429: Too Many Requests."
+        match = _HTTP_STATUS.search(str(exc))
+        status = int(match.group(1)) if match else None
+    return status
+
+
+def record_retry_after(response, *args, **kwargs):
+    """Hook de resposta do requests: guarda o Retry-After da última resposta desta thread.
+
+    O ytmusicapi levanta a exceção só com o texto ("Server returned HTTP
+    429: ..."), sem a resposta; `retry_after` lê o cabeçalho daqui.
+    """
+    _responses.retry_after = response.headers.get('Retry-After')
+
+
+def retry_after(exc):
+    """Valor do cabeçalho Retry-After (segundos), da exceção ou da última resposta da thread."""
+    response = getattr(exc, 'response', None)
+    if response is not None:
+        value = (getattr(response, 'headers', None) or {}).get('Retry-After')
+    else:
+        value = getattr(_responses, 'retry_after', None)
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttle(exc):
+    """True para 429 e erros 5xx: o servidor pediu para diminuir o ritmo."""
+    status = http_status(exc)
+    return status is not None and (status == 429 or 500 <= status < 600)
+
+
+def is_transient(exc):
+    """Falhas de rede/resposta inválida que valem uma nova tentativa."""
+    # requests.RequestException herda de OSError; página de erro no lugar de JSON
+    return isinstance(exc, (OSError, json.JSONDecodeError))
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """Limitador AIMD compartilhado por todas as chamadas ao YouTube Music.
+
+    Enquanto as chamadas dão certo, a taxa sobe aos poucos (aumento aditivo
+    de `increase` req/s por segundo); em HTTP 429 ou 5xx ela cai pela metade
+    (corte multiplicativo), respeitando o Retry-After quando existir, e a
+    chamada é repetida em vez de ser tratada como falha.
+    """
+
+    def __init__(self, rate=4.0, min_rate=0.5, max_rate=20.0, increase=0.5, decrease=0.5,
+                 max_retries=6, max_backoff=60.0):
+        super().__init__(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.throttled = 0
+        self.retries = 0
+        self._paused_until = 0.0
+        self._last_cut = 0.0
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    wait = self._wait_time(now)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self, delay):
+        """Corta a taxa e pausa todas as threads por `delay` segundos."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            # Várias respostas 429 simultâneas contam como um único corte
+            if now - self._last_cut > 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_cut = now
+            self._tokens = 0
+            self._paused_until = max(self._paused_until, now + delay)
+
+    def call(self, fn, *args, **kwargs):
+        """Executa fn(*args, **kwargs) dentro do limite, repetindo se limitada."""
+        return self._call(fn, args, kwargs, writes=False)
+
+    def call_write(self, fn, *args, **kwargs):
+        """Como `call`, para escritas (criar playlist, adicionar músicas).
+
+        Só repete em HTTP 429, quando o servidor recusou a requisição sem
+        aplicá-la. Timeouts e 5xx podem chegar depois de a escrita ter sido
+        feita, e repetir criaria uma playlist ou um lote em dobro.
+        """
+        return self._call(fn, args, kwargs, writes=True)
+
+    def _call(self, fn, args, kwargs, writes):
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if writes:
+                    throttled = http_status(e) == 429
+                    retry = throttled
+                else:
+                    throttled = is_throttle(e)
+                    retry = throttled or is_transient(e)
+                if attempt >= self.max_retries or not retry:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    # Backoff exponencial com jitter
+                    delay = min(self.max_backoff, 2 ** attempt) * random.uniform(0.5, 1.0)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                if throttled:
+                    self.on_throttle(delay)
+                else:
+                    time.sleep(delay)
+                continue
+            self.on_success()
+            return result
@@ -0,0 +1,160 @@
+"""
+Busca concorrente de músicas no YouTube Music.
+
+Mantém várias buscas em andamento ao mesmo tempo e devolve os resultados
+na ordem original das músicas (para preservar a ordem da playlist). O
+ritmo das requisições fica a cargo do limitador usado por `search_fn`.
+
+Quando várias playlists são transferidas ao mesmo tempo, cada uma é um
+"fluxo" do FairScheduler: os workers atendem os fluxos em rodízio, então
+uma playlist enorme não atrasa as pequenas que vieram depois dela.
+
+Músicas repetidas entre playlists passam por um SingleFlight: a mesma
+busca nunca fica em andamento duas vezes e o resultado é reaproveitado
+pelo resto da execução.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+SEARCH_WORKERS = 4
+
+
+class FairScheduler:
+    """Pool de threads que alterna entre fluxos (round-robin) a cada tarefa."""
+
+    def __init__(self, workers=SEARCH_WORKERS):
+        self._cond = threading.Condition()
+        self._queues = {}       # fluxo -> deque de (future, fn, args)
+        self._ring = deque()    # fluxos com tarefas, na ordem de atendimento
+        self._closed = False
+        for _ in range(workers):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def submit(self, flow, fn, *args):
+        """Agenda fn(*args) no fluxo `flow`; retorna um Future."""
+        future = Future()
+        with self._cond:
+            tasks = self._queues.get(flow)
+            if tasks is None:
+                tasks = self._queues[flow] = deque()
+                self._ring.append(flow)
+            tasks.append((future, fn, args))
+            self._cond.notify()
+        return future
+
+    def shutdown(self):
+        """Encerra os workers depois que as tarefas já agendadas terminarem."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _next_task(self):
+        with self._cond:
+            while not self._ring:
+                if self._closed:
+                    return None
+                self._cond.wait()
+            flow = self._ring.popleft()
+            tasks = self._queues[flow]
+            task = tasks.popleft()
+            if tasks:
+                self._ring.append(flow)  # volta para o fim da fila
+            else:
+                del self._queues[flow]
+            return task
+
+    def _work(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            future, fn, args = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+
+class SingleFlight:
+    """Compartilha uma chamada (em andamento ou concluída) entre chamadores da mesma chave."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}   # chave -> Future
+        self.calls = 0     # chamadas realmente executadas
+        self.shared = 0    # chamadas evitadas
+
+    def do(self, key, fn, *args):
+        """Retorna fn(*args), executando no máximo uma vez por chave."""
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = self._calls[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if owner:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                # Falhas não são reaproveitadas: a próxima chamada tenta de novo
+                with self._lock:
+                    del self._calls[key]
+                future.set_exception(e)
+        return future.result()
+
+
+class SearchEngine:
+    """Buscas de várias playlists sobre um único FairScheduler."""
+
+    def __init__(self, search_fn, workers=SEARCH_WORKERS):
+        self.search_fn = search_fn
+        self.workers = workers
+        self.scheduler = FairScheduler(workers)
+
+    def shutdown(self):
+        self.scheduler.shutdown()
+
+    def search_ordered(self, tracks, should_cancel=None, flow=None):
+        """Gera (track, video_id, erro) na mesma ordem de `tracks`.
+
+        Se a busca falhar, video_id é None e `erro` traz a exceção (uma
+        falha não é o mesmo que "não encontrada").
+
+        No máximo 2 * workers buscas ficam enfileiradas por vez, então
+        `tracks` pode ser um iterador longo sem ser materializado.
+        `flow` identifica a playlist no rodízio do scheduler.
+        """
+        pending = deque()
+        source = iter(tracks)
+        window = self.workers * 2
+
+        try:
+            while True:
+                while len(pending) < window:
+                    track = next(source, None)
+                    if track is None:
+                        break
+                    pending.append((track, self.scheduler.submit(flow, self.search_fn, track)))
+
+                if not pending:
+                    return
+                if should_cancel and should_cancel():
+                    return
+
+                track, future = pending.popleft()
+                try:
+                    result, error = future.result(), None
+                except Exception as e:
+                    result, error = None, e
+                yield track, result, error
+        finally:
+            # Cancelamento ou consumidor parou: descartar o que não começou
+            for _, future in pending:
+                future.cancel()
@@ -0,0 +1,346 @@
+"""
+Importação de playlists do Spotify.
+
+Playlists públicas são lidas do embed player (sem conta de desenvolvedor);
+como alternativa, aceita os CSVs exportados pelo Exportify.
+"""
+
+import csv
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+
+from models import Track
+
+FETCH_WORKERS = 4  # links buscados ao mesmo tempo
+BASE_URL = "https://open.spotify.com"  # trocado pelos benchmarks (servidor local)
+
+_session = None
+_session_lock = threading.Lock()
+
+# Extratores pré-compilados (rodam sobre o HTML inteiro da página)
+_EMBED_NEXT_DATA = re.compile(r'<script id="__NEXT_DATA__"[^>]*type="application/json">(.+?)</script>', re.DOTALL)
+_PAGE_NEXT_DATA = re.compile(r'<script id="__NEXT_DATA__"[^>]*>(.+?)</script>', re.DOTALL)
+_LD_JSON = re.compile(r'<script type="application/ld\+json">(.+?)</script>', re.DOTALL)
+_EMBED_NAME = re.compile(r'"name"\s*:\s*"([^"]{2,100})"[^}]*"type"\s*:\s*"playlist"')
+_EMBED_TRACK = re.compile(r'"title"\s*:\s*"([^"]+)"\s*,\s*"subtitle"\s*:\s*"([^"]+)"')
+_PLAYLIST_ID = re.compile(r'playlist/([a-zA-Z0-9]+)')
+
+
+def _log(log, message):
+    if log:
+        log(message)
+
+
+def get_session():
+    """Sessão HTTP única, reaproveitada entre importações (keep-alive).
+
+    O pool comporta FETCH_WORKERS conexões simultâneas com o mesmo host,
+    então vários links importados juntos não refazem o handshake TLS.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests  # importado só aqui: não pesa na inicialização da interface
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS * 2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def fetch_playlist(playlist_id, log=None, cache=None):
+    """Busca dados de uma playlist pública do Spotify usando o embed player."""
+    info = {}
+    tracks = list(iter_playlist(playlist_id, log=log, info=info, cache=cache))
+    return info['name'], tracks
+
+
+def _cached_tracks(entry):
+    return [Track(name, artists) for name, artists in entry['tracks']]
+
+
+def iter_playlist(playlist_id, log=None, info=None, cache=None):
+    """Gera as músicas da playlist conforme são extraídas, sem repetições.
+
+    Cada página é baixada inteira antes da extração: a primeira música só
+    sai depois do download e do parse da página que a contém.
+
+    `info['name']` recebe o nome da playlist assim que ele é conhecido
+    (normalmente antes da primeira música). Com `cache` (PlaylistCache),
+    uma cópia dentro do TTL é usada sem acessar a rede, e uma página do
+    embed que não mudou (HTTP 304 ou mesmo hash) não é lida de novo.
+    """
+    info = {} if info is None else info
+    info['name'] = "Spotify Playlist"
+    seen = set()
+    collected = []
+    validators = {}
+
+    cached = cache.get(playlist_id) if cache else None
+    if cached and cached['fresh']:
+        _log(log, "Playlist reaproveitada do cache local")
+        info['name'] = cached['name']
+        yield from _cached_tracks(cached)
+        return
+
+    def is_new(track):
+        if track.key in seen:
+            return False
+        seen.add(track.key)
+        collected.append(track)
+        return True
+
+    session = get_session()
+
+    # Método 1: Usar o embed player do Spotify
+    try:
+        # O embed player carrega dados de playlists públicas
+        embed_url = f"{BASE_URL}/embed/playlist/{playlist_id}"
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Referer': 'https://open.spotify.com/',
+        }
+
+        # Revalidação: o servidor pode responder 304 se nada mudou
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        resp = session.get(embed_url, headers=headers, timeout=20)
+
+        validators = {'etag': resp.headers.get('ETag'), 'last_modified': resp.headers.get('Last-Modified')}
+        unchanged = cached is not None and resp.status_code == 304
+        if resp.status_code == 200:
+            validators['sha1'] = hashlib.sha1(resp.content).hexdigest()
+            unchanged = cached is not None and validators['sha1'] == cached['sha1']
+        if unchanged:
+            _log(log, "Playlist sem alteracoes desde a ultima importacao")
+            cache.touch(playlist_id)
+            info['name'] = cached['name']
+            yield from _cached_tracks(cached)
+            return
+
+        if resp.status_code == 200:
+            html = resp.text
+
+            # O embed contém dados JSON no HTML
+            # Procurar por dados no script de inicialização
+            data_match = _EMBED_NEXT_DATA.search(html)
+            if data_match:
+                try:
+                    data = json.loads(data_match.group(1))
+                    # Navegar pela estrutura do Next.js
+                    props = data.get('props', {}).get('pageProps', {})
+
+                    # Extrair nome da playlist
+                    if 'state' in props:
+                        state = props['state']
+                        if 'data' in state and 'entity' in state['data']:
+                            entity = state['data']['entity']
+                            info['name'] = entity.get('name', info['name'])
+
+                            # Extrair tracks
+                            trackList = entity.get('trackList', [])
+                            for item in trackList:
+                                track_name = item.get('title', '')
+                                track_artists = item.get('subtitle', '')
+                                if track_name:
+                                    track = Track(track_name, track_artists)
+                                    if is_new(track):
+                                        yield track
+                except (json.JSONDecodeError, KeyError) as e:
+                    _log(log, f"Parse embed falhou: {e}")
+
+            # Fallback: procurar padrões alternativos no HTML do embed
+            if not seen:
+                # Procurar nome da playlist
+                name_match = _EMBED_NAME.search(html)
+                if name_match:
+                    info['name'] = name_match.group(1)
+
+                # Procurar por "title" e "subtitle" (format do embed)
+                for match in _EMBED_TRACK.finditer(html):
+                    title, subtitle = match.groups()
+                    if title and len(title) > 1 and subtitle:
+                        track = Track(title, subtitle)
+                        if is_new(track):
+                            yield track
+
+    except Exception as e:
+        _log(log, f"Embed falhou: {e}")
+
+    # Método 2: Tentar página normal com scraping mais agressivo
+    if not seen:
+        _log(log, "Tentando scraping da pagina...")
+        try:
+            url = f"{BASE_URL}/playlist/{playlist_id}"
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'pt-BR,pt;q=0.8,en-US;q=0.5,en;q=0.3',
+                'DNT': '1',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
+            }
+            resp = session.get(url, headers=headers, timeout=20)
+
+            if resp.status_code == 200:
+                html = resp.text
+
+                # Tentar extrair do __NEXT_DATA__ (músicas saem durante a visita)
+                tracks = []
+                next_match = _PAGE_NEXT_DATA.search(html)
+                if next_match:
+                    try:
+                        data = json.loads(next_match.group(1))
+                        for track in _iter_next_data(data, info):
+                            if is_new(track):
+                                yield track
+                    except RecursionError:
+                        # json.loads também é recursivo: JSON aninhado demais falha aqui
+                        _log(log, "__NEXT_DATA__ aninhado demais; tentando ld+json")
+                    except Exception:
+                        pass
+
+                # Tentar application/ld+json (schema.org)
+                if not seen:
+                    ld_match = _LD_JSON.search(html)
+                    if ld_match:
+                        try:
+                            ld_data = json.loads(ld_match.group(1))
+                            if ld_data.get('name'):
+                                info['name'] = ld_data['name']
+                            for t in ld_data.get('track', []):
+                                name = t.get('name', '')
+                                artist = ''
+                                if 'byArtist' in t:
+                                    ba = t['byArtist']
+                                    if isinstance(ba, dict):
+                                        artist = ba.get('name', '')
+                                    elif isinstance(ba, list):
+                                        artist = ", ".join([a.get('name', '') for a in ba])
+                                if name:
+                                    tracks.append(Track(name, artist))
+                        except:
+                            pass
+
+                for track in tracks:
+                    if is_new(track):
+                        yield track
+
+        except Exception as e:
+            _log(log, f"Scraping falhou: {e}")
+
+    # Método 3: oembed para nome
+    if not info['name'] or info['name'] == "Spotify Playlist":
+        try:
+            oembed_url = f"{BASE_URL}/oembed?url=https://open.spotify.com/playlist/{playlist_id}"
+            oembed_resp = session.get(oembed_url, timeout=10)
+            if oembed_resp.status_code == 200:
+                info['name'] = oembed_resp.json().get('title', info['name'])
+        except:
+            pass
+
+    if not seen and cached:
+        _log(log, "Spotify indisponivel: usando a copia do cache local")
+        info['name'] = cached['name']
+        yield from _cached_tracks(cached)
+        return
+
+    if not seen:
+        raise ValueError("Não foi possível encontrar dados da playlist.\nVerifique se a playlist é pública.")
+
+    if cache:
+        cache.put(playlist_id, info['name'], collected, **validators)
+
+
+def _iter_next_data(data, info):
+    """Gera as músicas do __NEXT_DATA__ numa única passada, em ordem de documento.
+
+    `info['name']` recebe o nome da playlist quando ele aparece. A visita
+    usa uma pilha explícita, então a profundidade do JSON não esbarra no
+    limite de recursão do Python, e não desce dentro de uma música já lida
+    (álbum, imagens).
+    """
+    named = False
+    seen = set()
+    # Pilha de iteradores: cada nível continua de onde parou (ordem de documento)
+    stack = [iter((data,))]
+    while stack:
+        for obj in stack[-1]:
+            kind = type(obj)
+            if kind is list:
+                stack.append(iter(obj))
+                break
+            if kind is not dict:
+                continue
+
+            if not named:
+                if obj.get('__typename') == 'Playlist' and obj.get('name'):
+                    info['name'], named = obj['name'], True
+                else:
+                    playlist = obj.get('playlist')
+                    if type(playlist) is dict and playlist.get('name'):
+                        info['name'], named = playlist['name'], True
+
+            # Objeto de música: nome + lista de artistas
+            artists = obj.get('artists')
+            if type(artists) is list and obj.get('name'):
+                artists = ", ".join([a.get('name', '') for a in artists if type(a) is dict])
+                if artists:
+                    key = (obj['name'], artists)
+                    if key not in seen:
+                        seen.add(key)
+                        yield Track(obj['name'], artists)
+                    # Dentro da música só há álbum, imagens e afins: não desce
+                    continue
+
+            stack.append(iter(obj.values()))
+            break
+        else:
+            stack.pop()
+
+
+def _parse_next_data(data):
+    """(nome da playlist, músicas) do __NEXT_DATA__; veja `_iter_next_data`."""
+    info = {}
+    tracks = list(_iter_next_data(data, info))
+    return info.get('name') or "Spotify Playlist", tracks
+
+
+def extract_playlist_id(url):
+    """Extrai o ID da playlist de um link do Spotify."""
+    # https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M
+    # https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M?si=...
+    match = _PLAYLIST_ID.search(url)
+    return match.group(1) if match else None
+
+
+def parse_csv(lines):
+    """Gera as músicas de um CSV do Exportify, linha a linha."""
+    reader = csv.reader(lines)
+    header = next(reader, None) or []
+    if 'Track Name' not in header:
+        return
+    name_col = header.index('Track Name')
+    artists_col = header.index('Artist Name(s)') if 'Artist Name(s)' in header else None
+    for row in reader:
+        track_name = row[name_col] if name_col < len(row) else ''
+        if track_name:
+            artists = row[artists_col] if artists_col is not None and artists_col < len(row) else ''
+            yield Track(track_name, artists)
+
+
+def load_csv(filepath):
+    """Lê um CSV do Exportify; retorna (nome da playlist, músicas)."""
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        return Path(filepath).stem, list(parse_csv(f))
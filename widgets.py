@@ -0,0 +1,178 @@
+"""
+Componentes de interface reutilizáveis.
+"""
+
+import tkinter as tk
+from bisect import bisect_left
+
+import customtkinter as ctk
+
+from normalize import normalize
+
+
+class VirtualList(ctk.CTkFrame):
+    """Lista virtualizada: só existem widgets para as linhas visíveis.
+
+    `create_row(parent)` cria o widget de uma linha (reaproveitado durante a
+    rolagem) e `bind_row(row, item, index)` preenche esse widget com um item.
+    Alterar um item e chamar `update_row(index)` atualiza só aquela linha.
+    """
+
+    SCROLL_STEP = 3  # linhas por passo da roda do mouse
+    WHEEL_EVENTS = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+
+    _instances = {}  # caminho do widget -> lista, para o handler global da roda
+
+    def __init__(self, master, row_height, create_row, bind_row, empty_text="", **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.items = []
+        self._rows = []
+        self._first = 0
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self._body = ctk.CTkFrame(self, fg_color="transparent")
+        self._body.grid(row=0, column=0, sticky="nsew")
+        self._body.bind("<Configure>", lambda e: self._layout())
+
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self._empty = ctk.CTkLabel(self._body, text=empty_text, font=ctk.CTkFont(size=14), text_color="gray")
+
+        # Um único handler global por janela raiz; cada lista só se registra
+        VirtualList._instances[str(self)] = self
+        root = self._root()
+        if not getattr(root, '_virtual_list_wheel', False):
+            root._virtual_list_wheel = True
+            for sequence in self.WHEEL_EVENTS:
+                root.bind_all(sequence, VirtualList._dispatch_wheel, add="+")
+
+    def destroy(self):
+        VirtualList._instances.pop(str(self), None)
+        super().destroy()
+
+    def set_items(self, items):
+        """Troca o conteúdo da lista (mantém a posição de rolagem se possível)."""
+        self.items = items
+        self._first = min(self._first, self._max_first())
+        self._render()
+
+    def set_empty_text(self, text):
+        self._empty.configure(text=text)
+
+    def update_row(self, index):
+        """Atualiza uma única linha, se ela estiver visível."""
+        pos = index - self._first
+        if 0 <= pos < len(self._rows) and index < len(self.items):
+            self.bind_row(self._rows[pos], self.items[index], index)
+
+    def refresh(self):
+        """Reaplica bind_row nas linhas visíveis (ex.: mudou um estado global)."""
+        self._render()
+
+    def _visible_count(self):
+        height = self._body.winfo_height()
+        row_px = self._apply_widget_scaling(self.row_height)
+        return max(1, int(height // row_px) + 1)
+
+    def _layout(self):
+        # Pool de linhas do tamanho da área visível
+        needed = self._visible_count()
+        while len(self._rows) < needed:
+            self._rows.append(self.create_row(self._body))
+        while len(self._rows) > needed:
+            self._rows.pop().destroy()
+        self._first = min(self._first, self._max_first())
+        self._render()
+
+    def _render(self):
+        if not self.items:
+            self._empty.place(relx=0.5, rely=0.3, anchor="center")
+        else:
+            self._empty.place_forget()
+
+        for pos, row in enumerate(self._rows):
+            index = self._first + pos
+            if index < len(self.items):
+                self.bind_row(row, self.items[index], index)
+                row.place(x=0, y=pos * self.row_height, relwidth=1.0, height=self.row_height)
+            else:
+                row.place_forget()
+
+        total = len(self.items)
+        if total:
+            visible = max(1, len(self._rows) - 1)
+            self._scrollbar.set(self._first / total, min(1.0, (self._first + visible) / total))
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _max_first(self):
+        # A última linha do pool pode ficar parcialmente visível
+        return max(0, len(self.items) - self._visible_count() + 1)
+
+    def _scroll_to(self, first):
+        first = max(0, min(int(first), self._max_first()))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(value) * len(self.items))
+        elif action == "scroll":
+            step = self._visible_count() if unit == "pages" else 1
+            self._scroll_to(self._first + int(value) * step)
+
+    @classmethod
+    def _dispatch_wheel(cls, event):
+        """Rola a lista que está sob o ponteiro (subindo pelos widgets pais)."""
+        if isinstance(event.widget, str):
+            return  # widget já destruído
+        try:
+            widget = event.widget.winfo_containing(event.x_root, event.y_root)
+        except (KeyError, tk.TclError):
+            return
+        while widget is not None:
+            target = cls._instances.get(str(widget))
+            if target is not None:
+                target._on_mousewheel(event)
+                return
+            widget = widget.master
+
+    def _on_mousewheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self._scroll_to(self._first - self.SCROLL_STEP)
+        else:
+            self._scroll_to(self._first + self.SCROLL_STEP)
+
+
+class PrefixIndex:
+    """Índice de prefixos de palavras para filtrar listas enquanto se digita."""
+
+    def __init__(self, texts):
+        self._count = len(texts)
+        self._entries = sorted(
+            (word, i) for i, text in enumerate(texts) for word in set(normalize(text).split())
+        )
+        self._words = [word for word, _ in self._entries]
+
+    def search(self, query):
+        """Índices (em ordem) dos textos em que cada palavra da busca prefixa alguma palavra."""
+        words = normalize(query).split()
+        if not words:
+            return list(range(self._count))
+
+        result = None
+        for word in words:
+            lo = bisect_left(self._words, word)
+            hi = bisect_left(self._words, word + "\uffff", lo)
+            matches = {i for _, i in self._entries[lo:hi]}
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        return sorted(result)